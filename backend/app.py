@@ -1,14 +1,14 @@
 from flask import Blueprint, request, jsonify
 import os
 import numpy as np
-import cv2
-from utils.preprocessing import preprocess_melanoma_image
-
-# Attempt to import TensorFlow
-try:
-    import tensorflow as tf
-except ImportError:
-    tf = None
+from utils.preprocessing import preprocess_melanoma_bytes, tta_variants
+from utils.storage import save_bytes_async, save_image_async
+from utils.batching import MicroBatcher
+from utils.prediction_cache import PredictionCache, model_identity
+from utils.preprocess_pool import get_preprocess_pool
+from utils.model_registry import registry
+from utils.inference_backends import load_backend, exported_path, resolve_backend
+from utils.metrics import metrics, stage
 
 # Create Blueprint
 image_bp = Blueprint('image_bp', __name__)
@@ -20,21 +20,54 @@ PROCESSED_FOLDER = os.path.join(BASE_DIR, 'processed')
 # This is where the user should put their .keras file
 MODEL_PATH = os.path.join(BASE_DIR, 'ai_models', 'mela_model_final.keras')
 
+# Keep copies of uploads and processed images (written in the background)
+SAVE_UPLOADS = os.getenv('SAVE_UPLOADS', '1') == '1'
+
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PROCESSED_FOLDER, exist_ok=True)
 
-# Load model globally
-model = None
-if tf:
-    try:
-        if os.path.exists(MODEL_PATH):
-            model = tf.keras.models.load_model(MODEL_PATH)
-            print(f"[SUCCESS] Model loaded from {MODEL_PATH}")
-        else:
-            print(f"[WARNING] Model file NOT found at {MODEL_PATH}")
+# Runtime used for the classifier: 'keras' (full TensorFlow), 'tflite' or 'onnx'.
+# tflite/onnx load the file written by export_model.py next to MODEL_PATH.
+INFERENCE_BACKEND = resolve_backend(os.getenv('INFERENCE_BACKEND', 'keras'))
+INFERENCE_QUANTIZE = os.getenv('INFERENCE_QUANTIZE', '')  # '', 'float16' or 'int8'
+INFERENCE_MODEL_PATH = os.getenv('INFERENCE_MODEL_PATH')  # explicit file overrides the above
+INFERENCE_THREADS = int(os.getenv('INFERENCE_THREADS', '0')) or None
+
+def served_model_path():
+    if INFERENCE_MODEL_PATH:
+        return INFERENCE_MODEL_PATH
+    if INFERENCE_BACKEND == 'keras':
+        return MODEL_PATH
+    return exported_path(MODEL_PATH, INFERENCE_BACKEND, INFERENCE_QUANTIZE or None)
+
+def load_melanoma_model():
+    path = served_model_path()
+    if not os.path.exists(path):
+        print(f"[WARNING] Model file NOT found at {path}")
+        if INFERENCE_BACKEND == 'keras':
             print(f"Please ensure your model is named 'mela_model_final.keras' and placed in {os.path.join(BASE_DIR, 'ai_models')}")
-    except Exception as e:
-        print(f"[ERROR] Failed to load model: {e}")
+        else:
+            print(f"Run 'python export_model.py --format {INFERENCE_BACKEND}' to create it")
+        return None
+
+    # Identity of the file as it is read now; the prediction cache is keyed on it
+    identity = model_identity(path)
+    # TensorFlow / runtimes take seconds to import, so they are only pulled in here
+    try:
+        model = load_backend(INFERENCE_BACKEND, path, INFERENCE_THREADS)
+    except ImportError as e:
+        print(f"[WARNING] {INFERENCE_BACKEND} runtime is not installed ({e}); /analyze will run without a model")
+        return None
+    # Cached outputs of a previously loaded model (e.g. before registry.reload) no longer apply
+    prediction_cache.set_model(identity)
+    print(f"[SUCCESS] Model loaded from {path} ({INFERENCE_BACKEND})")
+    return model
+
+# Model is loaded on first use (or warmed in the background by main_server)
+registry.register('melanoma', load_melanoma_model)
+
+def get_model():
+    return registry.get('melanoma')
 
 # Class Labels (HAM10000 Standard)
 CLASS_LABELS = [
@@ -49,6 +82,52 @@ CLASS_LABELS = [
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'bmp'}
 
+# Micro-batching: concurrent /analyze requests share one model.predict call
+INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '16'))
+INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', '20'))
+
+def _predict_batch(images):
+    with stage('analyze', 'model_predict'):
+        return get_model().predict(np.stack(images), verbose=0)
+
+batcher = MicroBatcher(_predict_batch, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS, name='inference-batcher')
+metrics.gauge('inference_queue_depth', 'Images waiting for the next model.predict batch.',
+              lambda: batcher.stats()['queueDepth'])
+
+def predict_probabilities(img_array):
+    """
+    img_array: normalized (224, 224, 3) float32 image
+    returns: class probability vector for that image
+    """
+    if INFERENCE_MAX_BATCH <= 1:
+        return _predict_batch([img_array])[0]
+    return batcher(img_array)
+
+def predict_probabilities_tta(img_array):
+    """
+    Test-time augmentation: score the image with its flips/rotations in a
+    single predict call and average the class probabilities.
+    """
+    variants = tta_variants(img_array)
+    return get_model().predict(variants, verbose=0).mean(axis=0)
+
+def top_k_classes(probs, k):
+    order = np.argsort(probs)[::-1][:k]
+    return [{'label': CLASS_LABELS[i], 'probability': float(round(float(probs[i]) * 100, 2))} for i in order]
+
+# Prediction cache keyed by upload hash + identity of the loaded model file
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '1024'))
+PREDICTION_CACHE_DB = os.getenv('PREDICTION_CACHE_DB')  # e.g. prediction_cache.db next to skin_app.db
+prediction_cache = PredictionCache(served_model_path(), PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DB)
+
+# Optional worker processes for OpenCV preprocessing (0 = run in the request thread)
+PREPROCESS_WORKERS = int(os.getenv('PREPROCESS_WORKERS', '0'))
+
+def preprocess_upload(image_bytes):
+    if PREPROCESS_WORKERS > 0:
+        return get_preprocess_pool(PREPROCESS_WORKERS).preprocess(image_bytes)
+    return preprocess_melanoma_bytes(image_bytes)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -64,37 +143,68 @@ def analyze():
     if not allowed_file(file.filename):
         return jsonify({'error': 'Unsupported file type'}), 400
 
-    # Save original image
-    image_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(image_path)
-    print(f"[DEBUG] Received and saved file: {file.filename} at {image_path}")
+    # Optional response modes: ?top_k=3 for runner-up classes, ?tta=1 for augmentation
+    try:
+        top_k = min(int(request.args.get('top_k', request.form.get('top_k', 0))), len(CLASS_LABELS))
+    except ValueError:
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    use_tta = str(request.args.get('tta', request.form.get('tta', '0'))).lower() in ('1', 'true', 'yes')
+
+    # Read upload into memory; disk copies are an optional background task
+    with stage('analyze', 'read_upload'):
+        image_bytes = file.read()
+    print(f"[DEBUG] Received file: {file.filename} ({len(image_bytes)} bytes)")
 
     # Preprocess image
     try:
-        preprocessed = preprocess_melanoma_image(image_path)
-        if preprocessed is None:
-            raise ValueError("Preprocessing returned None")
-            
-        processed_path = os.path.join(PROCESSED_FOLDER, file.filename)
-        cv2.imwrite(processed_path, preprocessed)
-        print(f"[DEBUG] Preprocessed image saved at: {processed_path}")
+        model = get_model()
+
+        # Re-uploads of the same photo skip preprocessing and the model
+        with stage('analyze', 'cache_lookup'):
+            cache_key = prediction_cache.image_key(image_bytes) + (':tta' if use_tta else '')
+            probs = prediction_cache.get(cache_key) if model else None
+
+        if probs is None:
+            with stage('analyze', 'preprocess'):
+                preprocessed = preprocess_upload(image_bytes)
+            if preprocessed is None:
+                raise ValueError("Preprocessing returned None")
+
+            if SAVE_UPLOADS:
+                save_image_async(os.path.join(PROCESSED_FOLDER, file.filename), preprocessed)
+
+            if model:
+                # Prepare image for model (Normalize)
+                img_array = preprocessed.astype('float32') / 255.0
+
+                # Predict (grouped with concurrent requests by the batcher;
+                # includes the wait for the batch to fill)
+                with stage('analyze', 'predict'):
+                    if use_tta:
+                        probs = predict_probabilities_tta(img_array)
+                    else:
+                        probs = predict_probabilities(img_array)
+                prediction_cache.put(cache_key, probs)
+        else:
+            print(f"[DEBUG] Prediction cache hit for {file.filename}")
+
+        if SAVE_UPLOADS:
+            save_bytes_async(os.path.join(UPLOAD_FOLDER, file.filename), image_bytes)
 
         # Real model prediction logic
         if model:
-            # Prepare image for model (Normalize and Batch)
-            img_array = preprocessed.astype('float32') / 255.0
-            img_array = np.expand_dims(img_array, axis=0)
-            
-            # Predict
-            predictions = model.predict(img_array)
-            class_idx = np.argmax(predictions[0])
-            confidence = float(predictions[0][class_idx])
+            class_idx = int(np.argmax(probs))
+            confidence = float(probs[class_idx])
             
             result = {
                 'prediction': CLASS_LABELS[class_idx],
                 'confidence': float(round(confidence * 100, 2)), # e.g. 92.45
                 'status': 'success'
             }
+            if top_k > 0:
+                result['topK'] = top_k_classes(probs, top_k)
+            if use_tta:
+                result['tta'] = True
         else:
             # Fallback to dummy if model not loaded
             result = {
@@ -109,3 +219,7 @@ def analyze():
     except Exception as e:
         print(f"[ERROR] Analysis failed: {e}")
         return jsonify({'error': f"Analysis failed: {str(e)}"}), 500
+
+@image_bp.route('/analyze/cache', methods=['GET'])
+def analyze_cache_stats():
+    return jsonify(prediction_cache.stats()), 200
@@ -1,17 +1,7 @@
 import mongoengine
-from bson import ObjectId
-from datetime import datetime
-
-def clean_data(data):
-    if isinstance(data, list):
-        return [clean_data(item) for item in data]
-    if isinstance(data, dict):
-        return {k: clean_data(v) for k, v in data.items()}
-    if isinstance(data, ObjectId):
-        return str(data)
-    if isinstance(data, datetime):
-        return data.isoformat()
-    return data
+from bson import DBRef
+
+from utils.serialization import DocumentEncoder
 
 class User(mongoengine.DynamicDocument):
     name = mongoengine.StringField()
@@ -19,16 +9,17 @@ class User(mongoengine.DynamicDocument):
     password = mongoengine.StringField(required=True)
     role = mongoengine.StringField(default='user')
     
-    meta = {'collection': 'users', 'strict': False}
+    meta = {
+        'collection': 'users',
+        'strict': False,
+        'indexes': [
+            ('name', 'id'),     # /users listing and its keyset cursor
+            'role'              # admin count in /register-admin
+        ]
+    }
 
     def to_dict(self):
-        return clean_data({
-            'id': str(self.id),
-            '_id': str(self.id),
-            'name': getattr(self, 'name', ''),
-            'email': getattr(self, 'email', ''),
-            'role': getattr(self, 'role', 'user')
-        })
+        return USER_ENCODER.encode_document(self)
 
 class Dermatologist(mongoengine.DynamicDocument):
     name = mongoengine.StringField(required=True)
@@ -37,20 +28,13 @@ class Dermatologist(mongoengine.DynamicDocument):
     meta = {'collection': 'dermatologists', 'strict': False}
 
     def to_dict(self):
-        return clean_data({
-            'id': str(self.id),
-            '_id': str(self.id),
-            'name': getattr(self, 'name', ''),
-            'specialization': getattr(self, 'specialization', ''),
-            'imageUrl': getattr(self, 'imageUrl', "https://via.placeholder.com/150"),
-            'qualification': getattr(self, 'qualification', ''),
-            'experience': getattr(self, 'experience', 0),
-            'about': getattr(self, 'about', ''),
-            'rating': getattr(self, 'rating', 5.0),
-            'reviewsCount': getattr(self, 'reviewsCount', 0),
-            'hourlyRate': getattr(self, 'hourlyRate', 0),
-            'availability': getattr(self, 'availability', [])
-        })
+        return DERMATOLOGIST_ENCODER.encode_document(self)
+
+# Statuses that hold a slot; only these carry a slotKey
+ACTIVE_STATUSES = ['pending', 'approved']
+
+def make_slot_key(dermatologist_id, date, time):
+    return f"{dermatologist_id}|{date}|{time}"
 
 class Appointment(mongoengine.DynamicDocument):
     userId = mongoengine.ReferenceField(User, required=True)
@@ -61,8 +45,31 @@ class Appointment(mongoengine.DynamicDocument):
     adminNote = mongoengine.StringField()
     patientName = mongoengine.StringField()
     phoneNumber = mongoengine.StringField()
+    # "<doctor>|<date>|<time>" while the appointment is active, unset otherwise.
+    # The unique sparse index makes booking a single atomic insert.
+    slotKey = mongoengine.StringField()
     
-    meta = {'collection': 'appointments', 'strict': False}
+    meta = {
+        'collection': 'appointments',
+        'strict': False,
+        'indexes': [
+            # Slot lookups and the booking conflict check
+            ('dermatologistId', 'date', 'time', 'status'),
+            # /my, /admin/pending and /admin/all, newest first with the keyset tiebreaker
+            ('userId', '-date', '-time', '-id'),
+            ('status', '-date', '-time', '-id'),
+            ('-date', '-time', '-id'),
+            {'fields': ['slotKey'], 'unique': True, 'sparse': True}
+        ]
+    }
+
+    def clean(self):
+        # Runs on every save(): keep the reservation key in step with status
+        if self.status in ACTIVE_STATUSES:
+            doctor_id = _ref_id(self._data.get('dermatologistId'))
+            self.slotKey = make_slot_key(doctor_id, self.date, self.time)
+        else:
+            self.slotKey = None
 
     def to_dict(self):
         # Safely get the doctor data
@@ -71,7 +78,7 @@ class Appointment(mongoengine.DynamicDocument):
             if self.dermatologistId:
                 doctor_data = self.dermatologistId.to_dict()
         except:
-            doctor_data = {"name": "Deleted Doctor", "specialization": "N/A"}
+            doctor_data = DELETED_DOCTOR
 
         # Safely get the user data
         user_data = None
@@ -79,18 +86,109 @@ class Appointment(mongoengine.DynamicDocument):
             if self.userId:
                 user_data = self.userId.to_dict()
         except:
-            user_data = {"name": "Unknown User", "email": "N/A"}
-
-        return clean_data({
-            'id': str(self.id),
-            '_id': str(self.id),
-            'userId': user_data,
-            'dermatologistId': doctor_data,
-            'date': getattr(self, 'date', ''),
-            'time': getattr(self, 'time', ''),
-            'status': getattr(self, 'status', 'pending'),
-            'notes': getattr(self, 'notes', ''),
-            'adminNote': getattr(self, 'adminNote', ''),
-            'patientName': getattr(self, 'patientName', ''),
-            'phoneNumber': getattr(self, 'phoneNumber', '')
-        })
+            user_data = UNKNOWN_USER
+
+        return self._build_dict(user_data, doctor_data)
+
+    def _build_dict(self, user_data, doctor_data, keys=None):
+        return APPOINTMENT_ENCODER.encode_document(
+            self, keys, {'userId': user_data, 'dermatologistId': doctor_data})
+
+# ----- SERIALIZATION -----
+# Output shape of each to_dict(): (key, default when the document lacks it)
+USER_ENCODER = DocumentEncoder(User, [
+    ('id', None), ('_id', None), ('name', ''), ('email', ''), ('role', 'user')
+])
+
+DERMATOLOGIST_ENCODER = DocumentEncoder(Dermatologist, [
+    ('id', None), ('_id', None),
+    ('name', ''),
+    ('specialization', ''),
+    ('imageUrl', "https://via.placeholder.com/150"),
+    ('qualification', ''),
+    ('experience', 0),
+    ('about', ''),
+    ('rating', 5.0),
+    ('reviewsCount', 0),
+    ('hourlyRate', 0),
+    ('availability', [])
+])
+
+APPOINTMENT_ENCODER = DocumentEncoder(Appointment, [
+    ('id', None), ('_id', None),
+    ('userId', None),
+    ('dermatologistId', None),
+    ('date', ''),
+    ('time', ''),
+    ('status', 'pending'),
+    ('notes', ''),
+    ('adminNote', ''),
+    ('patientName', ''),
+    ('phoneNumber', '')
+])
+
+def backfill_slot_keys():
+    """Give active appointments created before slotKey existed their key."""
+    filled = 0
+    for appt in Appointment.objects(status__in=ACTIVE_STATUSES, slotKey__exists=False).no_dereference():
+        key = make_slot_key(_ref_id(appt._data.get('dermatologistId')), appt.date, appt.time)
+        try:
+            Appointment.objects(id=appt.id).update_one(set__slotKey=key)
+            filled += 1
+        except mongoengine.NotUniqueError:
+            print(f"[WARNING] Appointment {appt.id} double-books slot {key}; left without a slotKey")
+    return filled
+
+def ensure_indexes():
+    """Create the declared indexes (no-op for ones that already exist)."""
+    backfill_slot_keys()
+    for document in (User, Dermatologist, Appointment):
+        document.ensure_indexes()
+
+# Placeholders used when a referenced document no longer exists
+DELETED_DOCTOR = {"name": "Deleted Doctor", "specialization": "N/A"}
+UNKNOWN_USER = {"name": "Unknown User", "email": "N/A"}
+
+def _ref_id(value):
+    # Un-dereferenced references come back as DBRef, ObjectId or a Document
+    if isinstance(value, DBRef):
+        return value.id
+    if isinstance(value, mongoengine.Document):
+        return value.pk
+    return value
+
+def serialize_appointments(appointments, keys=None):
+    """
+    Bulk version of Appointment.to_dict() for querysets, lists of
+    appointments loaded without dereferencing, or raw .as_pymongo() dicts.
+
+    Loads every referenced user and dermatologist with one $in query each,
+    so a list costs 3 queries instead of 1 + 2N. Querysets and references
+    are read as raw documents, skipping mongoengine object construction.
+
+    keys: projection from APPOINTMENT_ENCODER.project(); references that are
+          not projected are not loaded
+    """
+    if hasattr(appointments, 'as_pymongo'):
+        appointments = appointments.as_pymongo()
+    rows = [(a, a['_id']) if isinstance(a, dict) else (a._data, a.pk) for a in appointments]
+    wanted = set(keys) if keys is not None else {'userId', 'dermatologistId'}
+    refs = [(_ref_id(data.get('userId')) if 'userId' in wanted else None,
+             _ref_id(data.get('dermatologistId')) if 'dermatologistId' in wanted else None)
+            for data, _ in rows]
+
+    user_ids = {u for u, _ in refs if u is not None}
+    doctor_ids = {d for _, d in refs if d is not None}
+    users = {u['_id']: USER_ENCODER.encode_raw(u)
+             for u in User.objects(pk__in=list(user_ids)).as_pymongo()} if user_ids else {}
+    doctors = {d['_id']: DERMATOLOGIST_ENCODER.encode_raw(d)
+               for d in Dermatologist.objects(pk__in=list(doctor_ids)).as_pymongo()} if doctor_ids else {}
+
+    result = []
+    for (data, pk), (user_id, doctor_id) in zip(rows, refs):
+        refs_out = {
+            'userId': users.get(user_id, UNKNOWN_USER) if user_id is not None else None,
+            'dermatologistId': doctors.get(doctor_id, DELETED_DOCTOR) if doctor_id is not None else None
+        }
+        result.append(APPOINTMENT_ENCODER.encode(data, pk, keys, refs_out))
+    return result
@@ -1,31 +1,77 @@
-from flask import Blueprint, request, jsonify
-from appointment_models import Dermatologist, Appointment
+from flask import Blueprint, request, jsonify, Response
+from mongoengine import signals, NotUniqueError
+import os
+from datetime import datetime, timedelta
+from appointment_models import (Dermatologist, Appointment, ACTIVE_STATUSES, serialize_appointments,
+                                APPOINTMENT_ENCODER, DERMATOLOGIST_ENCODER, _ref_id)
+from utils.response_cache import ResponseCache, create_backend
+from utils.serialization import dumps, json_response, parse_fields
+from utils.auth import current_user_id, current_role, login_required, roles_required
+from utils.pagination import wants_pagination, paginate, stream_ndjson, order_by_args
 
 appointment_bp = Blueprint('appointment_bp', __name__)
 
-# --- Helper for Auth ---
-def get_user_id(request):
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith('Bearer '):
-        token = auth_header.split(' ')[1]
+# --- Doctor directory cache ---
+# The list changes rarely but is the first screen every user loads
+DOCTORS_CACHE_KEY = 'doctors:list'
+doctors_cache = ResponseCache(create_backend(), ttl=int(os.getenv('DOCTORS_CACHE_TTL', '300')))
+
+def invalidate_doctors_cache(sender=None, document=None, **kwargs):
+    doctors_cache.invalidate(DOCTORS_CACHE_KEY)
+
+# Any saved/deleted Dermatologist document drops the cached list
+signals.post_save.connect(invalidate_doctors_cache, sender=Dermatologist)
+signals.post_delete.connect(invalidate_doctors_cache, sender=Dermatologist)
+
+# --- Appointment lists ---
+# Newest first; id breaks ties so the keyset cursor is unique
+APPOINTMENT_ORDER = [('date', -1), ('time', -1), ('id', -1)]
+
+def appointment_list_response(queryset):
+    """
+    Default: the full list, as before.
+    ?limit=N[&cursor=...]: one keyset page plus 'nextCursor'.
+    ?format=ndjson: stream every row as the Mongo cursor yields it.
+    ?fields=date,status,...: only those keys (plus id); Mongo only returns those fields.
+    """
+    try:
+        keys = parse_fields(request.args, APPOINTMENT_ENCODER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if keys is not None:
+        # Sort keys stay loaded for ordering and the keyset cursor
+        queryset = queryset.only(*APPOINTMENT_ENCODER.db_fields(keys), 'date', 'time')
+
+    if request.args.get('format') == 'ndjson':
+        return stream_ndjson(queryset.order_by(*order_by_args(APPOINTMENT_ORDER)).as_pymongo(),
+                             lambda chunk: serialize_appointments(chunk, keys))
+    if wants_pagination(request.args):
         try:
-            # Import here to avoid circular dependency if any
-            import jwt
-            import os
-            JWT_SECRET = os.getenv('JWT_SECRET', 'supersecretkey123')
-            decoded = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-            return decoded.get('id')
-        except:
-            return None
-    return None
+            docs, next_cursor = paginate(queryset.no_dereference(), APPOINTMENT_ORDER, request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return json_response({'appointments': serialize_appointments(docs, keys), 'nextCursor': next_cursor})
+    appointments = queryset.order_by('-date', '-time')
+    return json_response({'appointments': serialize_appointments(appointments, keys)})
 
 # --- Routes ---
 
 @appointment_bp.route('/doctors', methods=['GET'])
 def get_doctors():
-    doctors = Dermatologist.objects.all()
-    # No more auto-seeding to avoid confusion
-    return jsonify([d.to_dict() for d in doctors]), 200
+    def build():
+        doctors = Dermatologist.objects.all().as_pymongo()
+        # No more auto-seeding to avoid confusion
+        return dumps([DERMATOLOGIST_ENCODER.encode_raw(d) for d in doctors])
+
+    body, etag = doctors_cache.get_or_build(DOCTORS_CACHE_KEY, build)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, status=200, mimetype='application/json')
+    response.set_etag(etag)
+    # Clients may keep the list but must revalidate (cheap 304) each time
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @appointment_bp.route('/doctors/<string:doctor_id>/slots', methods=['GET'])
 def get_booked_slots(doctor_id):
@@ -34,7 +80,6 @@ def get_booked_slots(doctor_id):
         return jsonify({'error': 'Date is required'}), 400
     
     try:
-        from datetime import datetime
         dt = datetime.strptime(date_str, "%Y-%m-%d")
         day_name = dt.strftime("%A") # e.g., "Monday"
         
@@ -50,12 +95,13 @@ def get_booked_slots(doctor_id):
                 break
         
         # Get already booked slots for this doctor on this date
-        appointments = Appointment.objects(dermatologistId=doctor_id, date=date_str, status__in=['pending', 'approved'])
+        appointments = Appointment.objects(dermatologistId=doctor_id, date=date_str, status__in=ACTIVE_STATUSES).only('time')
         booked_slots = [appt.time for appt in appointments]
         
         # Calculate available (free) slots
-        # We preserve order of total_slots
-        available_slots = [s for s in total_slots if s not in booked_slots]
+        # We preserve order of total_slots; set lookup keeps this linear
+        taken = set(booked_slots)
+        available_slots = [s for s in total_slots if s not in taken]
         
         return jsonify({
             'availableSlots': available_slots, 
@@ -65,29 +111,114 @@ def get_booked_slots(doctor_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Longest range one calendar request may cover
+MAX_CALENDAR_DAYS = 62
+
+def build_calendar(doctors, start, end):
+    """
+    Free/booked slots per doctor per day from one aggregated appointment query.
+    doctors: Dermatologist documents; start/end: inclusive dates
+    """
+    dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    date_strs = [d.strftime("%Y-%m-%d") for d in dates]
+
+    # One query for every booked slot in the range, grouped by doctor and date
+    pipeline = [
+        {'$match': {
+            'dermatologistId': {'$in': [d.id for d in doctors]},
+            'date': {'$gte': date_strs[0], '$lte': date_strs[-1]},
+            'status': {'$in': ACTIVE_STATUSES}
+        }},
+        {'$group': {'_id': {'doctor': '$dermatologistId', 'date': '$date'}, 'times': {'$push': '$time'}}}
+    ]
+    booked = {(str(row['_id']['doctor']), row['_id']['date']): row['times']
+              for row in Appointment.objects.aggregate(pipeline)}
+
+    calendar = []
+    for doctor in doctors:
+        slots_by_day = {avail.get('day'): avail.get('timeSlots', []) for avail in getattr(doctor, 'availability', [])}
+        days = []
+        for dt, date_str in zip(dates, date_strs):
+            day_name = dt.strftime("%A")
+            total_slots = slots_by_day.get(day_name, [])
+            booked_slots = booked.get((str(doctor.id), date_str), [])
+            taken = set(booked_slots)
+            days.append({
+                'date': date_str,
+                'day': day_name,
+                'availableSlots': [s for s in total_slots if s not in taken],
+                'bookedSlots': booked_slots,
+                'totalSlots': total_slots
+            })
+        calendar.append({'doctorId': str(doctor.id), 'name': getattr(doctor, 'name', ''), 'days': days})
+    return calendar
+
+def parse_calendar_range(args):
+    start_str, end_str = args.get('start'), args.get('end')
+    if not start_str:
+        raise ValueError('start is required')
+    start = datetime.strptime(start_str, "%Y-%m-%d")
+    end = datetime.strptime(end_str, "%Y-%m-%d") if end_str else start + timedelta(days=13)
+    if end < start:
+        raise ValueError('end must not be before start')
+    if (end - start).days + 1 > MAX_CALENDAR_DAYS:
+        raise ValueError(f'Range is limited to {MAX_CALENDAR_DAYS} days')
+    return start, end
+
+@appointment_bp.route('/doctors/calendar', methods=['GET'])
+def get_calendar():
+    """
+    ?start=YYYY-MM-DD[&end=YYYY-MM-DD][&doctorId=...]
+    Free and booked slots for every doctor (or one) across a date range;
+    end defaults to two weeks after start.
+    """
+    try:
+        start, end = parse_calendar_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        doctor_id = request.args.get('doctorId')
+        doctors = list(Dermatologist.objects(id=doctor_id) if doctor_id else Dermatologist.objects.all())
+        if doctor_id and not doctors:
+            return jsonify({'error': 'Doctor not found'}), 404
+
+        return jsonify({
+            'start': start.strftime("%Y-%m-%d"),
+            'end': end.strftime("%Y-%m-%d"),
+            'doctors': build_calendar(doctors, start, end)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@appointment_bp.route('/doctors/<string:doctor_id>/calendar', methods=['GET'])
+def get_doctor_calendar(doctor_id):
+    try:
+        start, end = parse_calendar_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        doctor = Dermatologist.objects(id=doctor_id).first()
+        if not doctor:
+            return jsonify({'error': 'Doctor not found'}), 404
+        calendar = build_calendar([doctor], start, end)[0]
+        calendar.update({'start': start.strftime("%Y-%m-%d"), 'end': end.strftime("%Y-%m-%d")})
+        return jsonify(calendar), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @appointment_bp.route('/book', methods=['POST'])
+@login_required
 def book_appointment():
     try:
         data = request.get_json()
-        user_id = get_user_id(request)
-        if not user_id:
-            return jsonify({'success': False, 'message': 'Authentication required'}), 401
-        
+        user_id = current_user_id()
+
         required = ['dermatologistId', 'date', 'time']
         if not all(k in data for k in required):
             return jsonify({'success': False, 'message': 'Missing fields'}), 400
 
-        # Check for conflict
-        existing = Appointment.objects(
-            dermatologistId=data['dermatologistId'],
-            date=data['date'],
-            time=data['time'],
-            status__in=['pending', 'approved']
-        ).first()
-        
-        if existing:
-            return jsonify({'success': False, 'message': 'Slot already booked'}), 409
-
         new_appt = Appointment(
             userId=user_id,
             dermatologistId=data['dermatologistId'],
@@ -98,7 +229,12 @@ def book_appointment():
             phoneNumber=data.get('phoneNumber', ''),
             status='pending'
         )
-        new_appt.save()
+        # One atomic insert: the unique slotKey index rejects a taken slot,
+        # so concurrent taps on the same slot cannot both succeed
+        try:
+            new_appt.save(force_insert=True)
+        except NotUniqueError:
+            return jsonify({'success': False, 'message': 'Slot already booked'}), 409
         
         return jsonify({'success': True, 'message': 'Appointment booked successfully', 'appointment': new_appt.to_dict()}), 201
     except Exception as e:
@@ -106,20 +242,23 @@ def book_appointment():
 
 @appointment_bp.route('/my', methods=['GET'])
 def my_appointments():
-    user_id = get_user_id(request)
+    user_id = current_user_id()
     if not user_id:
         return jsonify([]), 200
-    appointments = Appointment.objects(userId=user_id).order_by('-date', '-time')
-    
-    return jsonify({'appointments': [a.to_dict() for a in appointments]}), 200
+    return appointment_list_response(Appointment.objects(userId=user_id))
 
 @appointment_bp.route('/<string:appointment_id>', methods=['DELETE'])
+@login_required
 def cancel_appointment(appointment_id):
     try:
-        appt = Appointment.objects(id=appointment_id).first()
+        appt = Appointment.objects(id=appointment_id).no_dereference().first()
         if not appt:
             return jsonify({'success': False, 'message': 'Appointment not found'}), 404
-            
+
+        # Patients may cancel only their own appointments; admins may cancel any
+        if current_role() != 'admin' and str(_ref_id(appt._data.get('userId'))) != current_user_id():
+            return jsonify({'success': False, 'message': 'Insufficient permissions'}), 403
+
         appt.status = 'cancelled'
         appt.save()
         
@@ -130,18 +269,18 @@ def cancel_appointment(appointment_id):
 # --- Admin Routes ---
 
 @appointment_bp.route('/admin/pending', methods=['GET'])
+@roles_required('admin')
 def get_pending_appointments():
-    # In a real app, verify admin role from token here
-    appointments = Appointment.objects(status='pending').order_by('-date', '-time')
-    return jsonify({'appointments': [a.to_dict() for a in appointments]}), 200
+    return appointment_list_response(Appointment.objects(status='pending'))
 
 @appointment_bp.route('/admin/all', methods=['GET'])
+@roles_required('admin')
 def get_all_appointments():
     # Fetch all appointments for history view
-    appointments = Appointment.objects().order_by('-date', '-time')
-    return jsonify({'appointments': [a.to_dict() for a in appointments]}), 200
+    return appointment_list_response(Appointment.objects())
 
 @appointment_bp.route('/admin/status/<string:appointment_id>', methods=['PUT'])
+@roles_required('admin')
 def update_appointment_status(appointment_id):
     try:
         data = request.get_json()
@@ -156,7 +295,12 @@ def update_appointment_status(appointment_id):
         appt.status = new_status
         if 'adminNote' in data:
             appt.adminNote = data['adminNote']
-        appt.save()
+        # Re-approving a rejected appointment claims its slot again, which
+        # someone else may have booked in the meantime
+        try:
+            appt.save()
+        except NotUniqueError:
+            return jsonify({'success': False, 'message': 'Slot already booked'}), 409
         
         return jsonify({'success': True, 'message': f'Appointment {new_status} successfully'}), 200
     except Exception as e:
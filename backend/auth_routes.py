@@ -1,14 +1,34 @@
 from flask import Blueprint, request, jsonify
 from flask_bcrypt import Bcrypt
-import jwt
 import os
-from appointment_models import User
+from appointment_models import User, USER_ENCODER
+from utils.pagination import wants_pagination, paginate, stream_ndjson, order_by_args
+from utils.serialization import json_response, parse_fields
+from utils.auth import issue_token, roles_required
+from utils.batching import QueueFullError
+from utils.password_hashing import create_hasher
+from utils.rate_limit import KeyedRateLimiter
+from utils.metrics import metrics
 
 auth_bp = Blueprint('auth_bp', __name__)
 bcrypt = Bcrypt()
 
-# Constants from environment
-JWT_SECRET = os.getenv('JWT_SECRET', 'supersecretkey123')
+# bcrypt runs on a small dedicated pool (BCRYPT_WORKERS, BCRYPT_ROUNDS, ...)
+# so a login spike cannot take every core from the other blueprints
+hasher = create_hasher(bcrypt)
+metrics.gauge('bcrypt_queue_depth', 'Password hashes waiting for a bcrypt worker.',
+              lambda: hasher.stats()['queueDepth'])
+
+# Per-email token bucket: LOGIN_BURST attempts at once, LOGIN_PER_MINUTE after that
+login_throttle = KeyedRateLimiter(capacity=int(os.getenv('LOGIN_BURST', '5')),
+                                  per_minute=float(os.getenv('LOGIN_PER_MINUTE', '5')))
+
+def busy_response(message, retry_after, status):
+    response = jsonify({'success': False, 'message': message})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status
+
+# Constants from environment (JWT_SECRET lives in utils.auth)
 ADMIN_SECRET = os.getenv('ADMIN_SECRET', 'admin123')
 
 @auth_bp.route('/register', methods=['POST'])
@@ -18,7 +38,6 @@ def register():
         name = data.get('name')
         email = data.get('email')
         password = data.get('password')
-        role = data.get('role', 'user')
 
         if not email or not password:
             return jsonify({'success': False, 'message': 'Email and password are required'}), 400
@@ -26,11 +45,14 @@ def register():
         if User.objects(email=email).first():
             return jsonify({'success': False, 'message': 'User already exists'}), 400
 
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-        new_user = User(name=name, email=email, password=hashed_password, role=role)
+        hashed_password = hasher.hash(password)
+        # Self-registration always creates a plain user; admins come from /register-admin
+        new_user = User(name=name, email=email, password=hashed_password, role='user')
         new_user.save()
 
         return jsonify({'success': True, 'message': 'User registered successfully'}), 201
+    except QueueFullError as e:
+        return busy_response('Server busy, please retry shortly', e.retry_after, 503)
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -53,11 +75,13 @@ def register_admin():
         if User.objects(email=email).first():
             return jsonify({'success': False, 'message': 'User already exists'}), 400
 
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        hashed_password = hasher.hash(password)
         new_admin = User(name=name, email=email, password=hashed_password, role='admin')
         new_admin.save()
 
         return jsonify({'success': True, 'message': 'Admin registered successfully'}), 201
+    except QueueFullError as e:
+        return busy_response('Server busy, please retry shortly', e.retry_after, 503)
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -69,22 +93,31 @@ def login():
         password = data.get('password', '').strip()
 
         print(f"Login attempt for: [{email}]")
+        # Throttled before any bcrypt work, so one account cannot fill the hashing pool
+        retry_after = login_throttle.acquire(email)
+        if retry_after:
+            return busy_response('Too many login attempts, please try again later', retry_after, 429)
+
         user = User.objects(email=email).first()
         
         if not user:
             print(f"User not found for email: [{email}]")
             return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
             
-        if not bcrypt.check_password_hash(user.password, password):
+        if not hasher.check(user.password, password):
             print(f"Password mismatch for user: [{email}]")
             return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
 
         print(f"Login success for user: [{email}] with role: {user.role}")
-        token = jwt.encode({
+        login_throttle.reset(email)
+        if hasher.needs_rehash(user.password):
+            # BCRYPT_ROUNDS changed since this hash was made; store one at the current cost
+            User.objects(id=user.id).update_one(set__password=hasher.hash(password))
+        token = issue_token({
             'id': str(user.id),
             'email': user.email,
             'role': user.role
-        }, JWT_SECRET, algorithm='HS256')
+        })
 
         return jsonify({
             'success': True,
@@ -97,12 +130,43 @@ def login():
                 'role': user.role
             }
         }), 200
+    except QueueFullError as e:
+        return busy_response('Server busy, please retry shortly', e.retry_after, 503)
     except Exception as e:
         print(f"Login error: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@auth_bp.route('/stats', methods=['GET'])
+@roles_required('admin')
+def auth_stats():
+    """Hashing pool queue/latency and login throttle counters."""
+    return jsonify({'hashing': hasher.stats(), 'loginThrottle': login_throttle.stats()}), 200
+
+# Keyset order for /users; id breaks ties between equal names
+USER_ORDER = [('name', 1), ('id', 1)]
+
 @auth_bp.route('/users', methods=['GET'])
+@roles_required('admin')
 def get_all_users():
-    # In a real app, verify admin role from token here
-    users = User.objects().order_by('name')
-    return jsonify({'success': True, 'users': [u.to_dict() for u in users]}), 200
+    # ?limit=N[&cursor=...] pages through users, ?format=ndjson streams them all,
+    # ?fields=name,email trims each user (and the Mongo projection) to those keys
+    try:
+        keys = parse_fields(request.args, USER_ENCODER)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    users = User.objects()
+    if keys is not None:
+        users = users.only(*USER_ENCODER.db_fields(keys), 'name')
+
+    if request.args.get('format') == 'ndjson':
+        users = users.order_by(*order_by_args(USER_ORDER)).as_pymongo()
+        return stream_ndjson(users, lambda chunk: [USER_ENCODER.encode_raw(u, keys) for u in chunk])
+    if wants_pagination(request.args):
+        try:
+            page, next_cursor = paginate(users, USER_ORDER, request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        return json_response({'success': True, 'users': [USER_ENCODER.encode_document(u, keys) for u in page],
+                              'nextCursor': next_cursor})
+    users = users.order_by('name').as_pymongo()
+    return json_response({'success': True, 'users': [USER_ENCODER.encode_raw(u, keys) for u in users]})
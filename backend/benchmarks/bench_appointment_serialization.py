@@ -0,0 +1,89 @@
+"""
+Mongo query count and time for serializing appointment lists:
+per-document Appointment.to_dict() (1 + 2N queries) against the bulk
+serialize_appointments() path (3 queries).
+
+Runs against an in-memory mongomock database (pip install mongomock) and
+counts every find issued by mongoengine.
+
+Usage (from backend/):
+    python benchmarks/bench_appointment_serialization.py --sizes 10 1000 100000
+
+The per-document path is only timed up to --legacy-max appointments; above
+that its query count (1 + 2N) is reported without running it.
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import mongomock
+import mongoengine
+from mongomock.collection import Collection
+
+from appointment_models import User, Dermatologist, Appointment, serialize_appointments
+
+QUERIES = [0]
+_original_find = Collection.find
+
+
+def counting_find(self, *args, **kwargs):
+    QUERIES[0] += 1
+    return _original_find(self, *args, **kwargs)
+
+
+def seed(count, users=200, doctors=20):
+    db = mongoengine.get_db()
+    for name in ('users', 'dermatologists', 'appointments'):
+        db.drop_collection(name)
+    user_ids = [u.id for u in User.objects.insert(
+        [User(name=f"user{i}", email=f"user{i}@example.com", password='x') for i in range(users)])]
+    doctor_ids = [d.id for d in Dermatologist.objects.insert(
+        [Dermatologist(name=f"Dr {i}", specialization='Dermatology') for i in range(doctors)])]
+    batch = []
+    for i in range(count):
+        batch.append(Appointment(userId=user_ids[i % users], dermatologistId=doctor_ids[i % doctors],
+                                 date=f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", time=f"{9 + i % 8}:00"))
+        if len(batch) == 5000:
+            Appointment.objects.insert(batch, load_bulk=False)
+            batch = []
+    if batch:
+        Appointment.objects.insert(batch, load_bulk=False)
+
+
+def measure(fn):
+    QUERIES[0] = 0
+    start = time.perf_counter()
+    rows = fn()
+    return QUERIES[0], (time.perf_counter() - start) * 1000, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000])
+    parser.add_argument('--legacy-max', type=int, default=5000)
+    args = parser.parse_args()
+
+    mongoengine.connect('skin_app_bench', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    Collection.find = counting_find
+
+    print(f"{'appointments':>12} {'to_dict() queries':>18} {'ms':>9} {'bulk queries':>13} {'ms':>9}")
+    for size in args.sizes:
+        seed(size)
+        queryset = lambda: Appointment.objects().order_by('-date', '-time')
+        if size <= args.legacy_max:
+            legacy_q, legacy_ms, _ = measure(lambda: [a.to_dict() for a in queryset()])
+            legacy = f"{legacy_q:>18} {legacy_ms:>9.0f}"
+        else:
+            legacy = f"{1 + 2 * size:>18} {'skipped':>9}"
+        bulk_q, bulk_ms, rows = measure(lambda: serialize_appointments(queryset()))
+        assert rows == size
+        print(f"{size:>12} {legacy} {bulk_q:>13} {bulk_ms:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
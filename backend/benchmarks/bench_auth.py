@@ -0,0 +1,81 @@
+"""
+Microbenchmark: per-request cost of resolving the caller from the bearer token.
+
+    legacy      the old get_user_id(): import jwt/os, read JWT_SECRET and
+                decode the HS256 token on every call
+    no cache    utils.auth with the verified-token cache disabled
+                (one decode per request, memoized on flask.g)
+    cached      utils.auth with the token cache warm
+
+Each request context calls the helper --lookups times, as a route plus its
+decorators would.
+
+Usage (from backend/):
+    python benchmarks/bench_auth.py --requests 20000 --lookups 3
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask
+
+from utils import auth
+
+
+def legacy_get_user_id(request):
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+        try:
+            import jwt
+            import os
+            JWT_SECRET = os.getenv('JWT_SECRET', 'supersecretkey123')
+            decoded = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+            return decoded.get('id')
+        except:
+            return None
+    return None
+
+
+def run(app, headers, requests, lookups, resolve):
+    start = time.perf_counter()
+    for _ in range(requests):
+        with app.test_request_context('/api/appointments/my', headers=headers) as ctx:
+            for _ in range(lookups):
+                resolve(ctx.request)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=3, help='token lookups per request')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    token = auth.issue_token({'id': '665f1c2e9b1e8a0012345678', 'email': 'pat@example.com', 'role': 'admin'})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    baseline = run(app, headers, args.requests, args.lookups, lambda request: None)
+    print(f"{args.requests} requests x {args.lookups} lookups; "
+          f"empty request context {baseline:.1f} us (subtracted below)")
+
+    results = [('legacy', run(app, headers, args.requests, args.lookups, legacy_get_user_id))]
+    cache_size = auth.token_cache.max_entries
+    auth.token_cache.max_entries = 0
+    results.append(('no cache', run(app, headers, args.requests, args.lookups, lambda r: auth.current_user_id())))
+    auth.token_cache.max_entries = cache_size
+    auth.token_cache.clear()
+    results.append(('cached', run(app, headers, args.requests, args.lookups, lambda r: auth.current_user_id())))
+
+    for label, us in results:
+        print(f"{label:<9} {us - baseline:7.1f} us auth overhead per request")
+
+
+if __name__ == '__main__':
+    main()
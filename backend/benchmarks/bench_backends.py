@@ -0,0 +1,99 @@
+"""
+Latency and memory (RSS) of each classifier inference backend.
+
+Each backend runs in its own subprocess so import cost and resident memory
+are measured in isolation. Backends whose runtime or exported file is
+missing are reported and skipped; create exports with export_model.py.
+
+Usage (from backend/):
+    python benchmarks/bench_backends.py
+    python benchmarks/bench_backends.py --backends keras tflite:int8 onnx
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        # ru_maxrss is KB on Linux, bytes on macOS
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1e6
+
+
+def run_one(spec, repeats):
+    """Child process: load one backend and time it. Prints a JSON line."""
+    import numpy as np
+    from app import MODEL_PATH
+    from utils.inference_backends import exported_path, load_backend
+
+    backend, _, quantize = spec.partition(':')
+    path = MODEL_PATH if backend == 'keras' else exported_path(MODEL_PATH, backend, quantize or None)
+    if not os.path.exists(path):
+        print(json.dumps({'spec': spec, 'skipped': f'{path} not found'}))
+        return
+
+    start = time.perf_counter()
+    try:
+        model = load_backend(backend, path)
+    except ImportError as e:
+        print(json.dumps({'spec': spec, 'skipped': str(e)}))
+        return
+    load_s = time.perf_counter() - start
+
+    result = {'spec': spec, 'loadSeconds': round(load_s, 2)}
+    for batch_size in (1, 16):
+        batch = np.random.rand(batch_size, 224, 224, 3).astype('float32')
+        model.predict(batch, verbose=0)  # warm-up
+        timings = []
+        for _ in range(repeats):
+            t = time.perf_counter()
+            model.predict(batch, verbose=0)
+            timings.append((time.perf_counter() - t) * 1000)
+        timings.sort()
+        result[f'p50_batch{batch_size}_ms'] = round(timings[len(timings) // 2], 2)
+    result['peakRssMB'] = round(peak_rss_mb(), 1)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', nargs='+',
+                        default=['keras', 'tflite', 'tflite:float16', 'tflite:int8', 'onnx'],
+                        help='backend[:quantize] entries')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.child, args.repeats)
+        return
+
+    print(f"{'backend':<16}{'load s':>8}{'b=1 ms':>10}{'b=16 ms':>10}{'RSS MB':>10}")
+    for spec in args.backends:
+        out = subprocess.run([sys.executable, __file__, '--child', spec, '--repeats', str(args.repeats)],
+                             cwd=BACKEND_DIR, capture_output=True, text=True)
+        lines = [l for l in out.stdout.splitlines() if l.startswith('{')]
+        if not lines:
+            print(f"{spec:<16} failed: {out.stderr.strip().splitlines()[-1:] or 'no output'}")
+            continue
+        r = json.loads(lines[-1])
+        if 'skipped' in r:
+            print(f"{spec:<16} skipped ({r['skipped']})")
+            continue
+        print(f"{spec:<16}{r['loadSeconds']:>8}{r['p50_batch1_ms']:>10}{r['p50_batch16_ms']:>10}{r['peakRssMB']:>10}")
+
+
+if __name__ == '__main__':
+    main()
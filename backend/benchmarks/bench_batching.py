@@ -0,0 +1,83 @@
+"""
+Throughput benchmark: unbatched vs micro-batched inference.
+
+Uses a stub model whose predict() costs a fixed dispatch overhead plus a
+small per-image cost, which is roughly how Keras behaves on CPU.
+
+Usage (from backend/):
+    python benchmarks/bench_batching.py --clients 32 --requests 20
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.batching import MicroBatcher
+
+
+class StubModel:
+    def __init__(self, overhead_ms=8.0, per_image_ms=0.5, num_classes=7):
+        self.overhead = overhead_ms / 1000.0
+        self.per_image = per_image_ms / 1000.0
+        self.num_classes = num_classes
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def predict(self, batch, verbose=0):
+        # A real model serializes on the device, so does the stub
+        with self._lock:
+            self.calls += 1
+            time.sleep(self.overhead + self.per_image * len(batch))
+        out = np.random.rand(len(batch), self.num_classes).astype('float32')
+        return out / out.sum(axis=1, keepdims=True)
+
+
+def run_clients(predict_one, clients, requests_per_client):
+    img = np.zeros((224, 224, 3), dtype='float32')
+
+    def worker():
+        for _ in range(requests_per_client):
+            predict_one(img)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    parser.add_argument('--max-batch', type=int, default=16)
+    parser.add_argument('--max-wait-ms', type=float, default=20)
+    parser.add_argument('--overhead-ms', type=float, default=8.0)
+    parser.add_argument('--per-image-ms', type=float, default=0.5)
+    args = parser.parse_args()
+
+    total = args.clients * args.requests
+
+    model = StubModel(args.overhead_ms, args.per_image_ms)
+    elapsed = run_clients(lambda img: model.predict(np.expand_dims(img, 0))[0], args.clients, args.requests)
+    print(f"unbatched: {total / elapsed:8.1f} img/s  ({model.calls} predict calls, {elapsed:.2f}s)")
+
+    model = StubModel(args.overhead_ms, args.per_image_ms)
+    batcher = MicroBatcher(lambda imgs: model.predict(np.stack(imgs)), args.max_batch, args.max_wait_ms).start()
+    elapsed = run_clients(batcher, args.clients, args.requests)
+    batcher.stop()
+    print(f"batched:   {total / elapsed:8.1f} img/s  ({model.calls} predict calls, {elapsed:.2f}s, "
+          f"avg batch {total / max(model.calls, 1):.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Concurrency stress test for POST /api/appointments/book.
+
+Fires many parallel bookings at a small number of slots and reports
+throughput, how many bookings succeeded (201) or were refused (409), and
+how many slots ended up double-booked. The double-booking count must be 0.
+
+Runs against a scratch database (it is dropped before and after):
+    python benchmarks/bench_booking_concurrency.py --mongo-uri mongodb://localhost:27017/skin_app_stress
+    python benchmarks/bench_booking_concurrency.py --mock    # in-memory mongomock, no server needed
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import jwt
+import mongoengine
+from flask import Flask
+
+from appointment_models import User, Dermatologist, Appointment, ACTIVE_STATUSES, ensure_indexes
+
+
+def drop_all():
+    db = mongoengine.get_db()
+    for name in ('users', 'dermatologists', 'appointments'):
+        db.drop_collection(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-uri', default='mongodb://localhost:27017/skin_app_stress')
+    parser.add_argument('--mock', action='store_true', help='use mongomock instead of a server')
+    parser.add_argument('--bookings', type=int, default=500)
+    parser.add_argument('--slots', type=int, default=5, help='distinct slots everyone competes for')
+    parser.add_argument('--threads', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.mock:
+        import mongomock
+        mongoengine.connect('skin_app_stress', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    else:
+        mongoengine.connect(host=args.mongo_uri)
+    drop_all()
+    ensure_indexes()
+
+    import appointment_routes
+    app = Flask(__name__)
+    app.register_blueprint(appointment_routes.appointment_bp, url_prefix='/api/appointments')
+
+    secret = os.getenv('JWT_SECRET', 'supersecretkey123')
+    users = User.objects.insert([User(name=f'p{i}', email=f'p{i}@example.com', password='x')
+                                 for i in range(args.threads)])
+    headers = [{'Authorization': 'Bearer ' + jwt.encode({'id': str(u.id), 'role': 'user'}, secret, algorithm='HS256')}
+               for u in users]
+    doctor = Dermatologist(name='Dr. Popular', specialization='Dermatology').save()
+    slots = [{'dermatologistId': str(doctor.id), 'date': '2025-01-06', 'time': f'{9 + i:02d}:00'}
+             for i in range(args.slots)]
+
+    statuses = Counter()
+    lock = threading.Lock()
+    per_thread = args.bookings // args.threads
+    start_gate = threading.Barrier(args.threads)
+
+    def worker(n):
+        client = app.test_client()
+        start_gate.wait()
+        for i in range(per_thread):
+            resp = client.post('/api/appointments/book', json=slots[(n + i) % len(slots)], headers=headers[n])
+            with lock:
+                statuses[resp.status_code] += 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    active = Counter((a.date, a.time) for a in Appointment.objects(status__in=ACTIVE_STATUSES).no_dereference())
+    double_booked = sum(1 for count in active.values() if count > 1)
+    total = sum(statuses.values())
+    print(f"{total} booking attempts on {args.slots} slots from {args.threads} threads in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} req/s)")
+    print(f"  201 booked: {statuses[201]}   409 conflict: {statuses[409]}   other: "
+          f"{total - statuses[201] - statuses[409]}")
+    print(f"  double-booked slots: {double_booked}")
+    drop_all()
+    return 1 if double_booked else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
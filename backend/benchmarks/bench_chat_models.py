@@ -0,0 +1,137 @@
+"""
+Memory, first-token latency and generation speed of chatbot model variants.
+
+Each variant loads in its own subprocess so resident memory is measured in
+isolation (the number that matters when several Flask workers each hold a
+copy). Variants are model[:quantize] entries, where model is a Hugging Face
+id or a local checkpoint directory and quantize is int8 or bfloat16.
+
+Usage (from backend/):
+    python benchmarks/bench_chat_models.py                   # biogpt: float32, int8, bfloat16
+    python benchmarks/bench_chat_models.py --variants ai_models/biogpt ai_models/biogpt:int8 --offline
+    python benchmarks/bench_chat_models.py --tiny            # random 2-layer stand-in, no download
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from bench_backends import peak_rss_mb
+
+PROMPT = "What are the early signs of melanoma on the skin?"
+
+
+def current_rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        return None
+
+
+def run_one(spec, repeats, new_tokens, offline):
+    """Child process: load one variant and time it. Prints a JSON line."""
+    from utils.chat_models import load_chat_model
+
+    model, _, quantize = spec.rpartition(':') if spec.endswith((':int8', ':bfloat16')) else (spec, '', '')
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    try:
+        generator = load_chat_model(model, quantize or None, offline)
+    except (ImportError, OSError) as e:
+        print(json.dumps({'spec': spec, 'skipped': str(e).splitlines()[0]}))
+        return
+    load_s = time.perf_counter() - start
+
+    import torch
+    lm, tokenizer = generator.model, generator.tokenizer
+    inputs = tokenizer(PROMPT, return_tensors="pt")
+    pad = tokenizer.pad_token_id
+
+    def generate(tokens):
+        with torch.inference_mode():
+            return lm.generate(**inputs, max_new_tokens=tokens, min_new_tokens=tokens,
+                               do_sample=False, pad_token_id=pad)
+
+    generate(2)  # warm-up
+    first = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        generate(1)
+        first.append((time.perf_counter() - t) * 1000)
+    first.sort()
+
+    t = time.perf_counter()
+    out = generate(new_tokens)
+    elapsed = time.perf_counter() - t
+    produced = out.shape[1] - inputs['input_ids'].shape[1]
+
+    result = {
+        'spec': spec,
+        'loadSeconds': round(load_s, 2),
+        'firstTokenMs': round(first[len(first) // 2], 1),
+        'tokensPerSec': round(produced / elapsed, 1),
+        'peakRssMB': round(peak_rss_mb(), 1)
+    }
+    rss_after = current_rss_mb()
+    if rss_before is not None:
+        result['modelRssMB'] = round(rss_after - rss_before, 1)
+    print(json.dumps(result))
+
+
+def main():
+    from chatbot_server import MODEL_NAME
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variants', nargs='+', help='model[:quantize] entries')
+    parser.add_argument('--tiny', action='store_true', help='benchmark a random tiny BioGPT (no download)')
+    parser.add_argument('--offline', action='store_true', help='never download; models must be local')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--new-tokens', type=int, default=64)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.child, args.repeats, args.new_tokens, args.offline)
+        return
+
+    tmp = None
+    model = MODEL_NAME
+    if args.tiny:
+        from utils.chat_models import build_tiny_checkpoint
+        tmp = tempfile.TemporaryDirectory()
+        try:
+            model = build_tiny_checkpoint(tmp.name)
+        except ImportError as e:
+            raise SystemExit(f"--tiny needs transformers and torch ({e})")
+    variants = args.variants or [model, f'{model}:int8', f'{model}:bfloat16']
+
+    print(f"{'variant':<40}{'load s':>8}{'1st tok ms':>12}{'tok/s':>8}{'model MB':>10}{'peak RSS MB':>13}")
+    for spec in variants:
+        cmd = [sys.executable, __file__, '--child', spec, '--repeats', str(args.repeats),
+               '--new-tokens', str(args.new_tokens)] + (['--offline'] if args.offline else [])
+        out = subprocess.run(cmd, cwd=BACKEND_DIR, capture_output=True, text=True)
+        label = os.path.basename(spec) if args.tiny else spec
+        lines = [l for l in out.stdout.splitlines() if l.startswith('{')]
+        if not lines:
+            print(f"{label:<40} failed: {out.stderr.strip().splitlines()[-1:] or 'no output'}")
+            continue
+        r = json.loads(lines[-1])
+        if 'skipped' in r:
+            print(f"{label:<40} skipped ({r['skipped']})")
+            continue
+        print(f"{label:<40}{r['loadSeconds']:>8}{r['firstTokenMs']:>12}{r['tokensPerSec']:>8}"
+              f"{r.get('modelRssMB', '-'):>10}{r['peakRssMB']:>13}")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
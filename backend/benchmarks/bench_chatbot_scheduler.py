@@ -0,0 +1,121 @@
+"""
+Offline load test for the /chatbot generation scheduler.
+
+BioGPT is replaced by a stub pipeline whose generate() costs a fixed
+overhead plus a per-token cost that grows only slightly with batch size
+(padded prompts decode in lockstep), which is how a small causal LM behaves
+on CPU. No model download or network is needed.
+
+Each mode sends the same burst of questions through the real Flask route:
+
+    unbatched   one prompt per generate() call, unbounded queue (old behaviour)
+    scheduled   padded batches, bounded queue, 429 + Retry-After when full
+
+Usage (from backend/):
+    python benchmarks/bench_chatbot_scheduler.py --clients 32 --requests 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from flask import Flask
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import chatbot_server
+from utils.batching import MicroBatcher
+from utils.model_registry import registry
+
+
+class StubGenerator:
+    """Stands in for the transformers text-generation pipeline."""
+
+    def __init__(self, overhead_ms=20.0, per_token_ms=2.0, batch_penalty=0.15, tokens=40):
+        self.overhead = overhead_ms / 1000.0
+        self.per_token = per_token_ms / 1000.0
+        self.batch_penalty = batch_penalty
+        self.tokens = tokens
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompts, batch_size=1, **kwargs):
+        prompts = [prompts] if isinstance(prompts, str) else prompts
+        # One model on one CPU: generate() calls run one at a time
+        with self._lock:
+            self.calls += 1
+            step = self.per_token * (1 + self.batch_penalty * (len(prompts) - 1))
+            time.sleep(self.overhead + step * self.tokens)
+        return [[{"generated_text": p + " is a common skin condition."}] for p in prompts]
+
+
+def run_burst(client, clients, requests_per_client):
+    latencies, statuses = [], []
+    lock = threading.Lock()
+
+    def worker(i):
+        for j in range(requests_per_client):
+            start = time.perf_counter()
+            resp = client.post('/chatbot', json={'question': f'what causes skin rash #{i}-{j}'})
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                statuses.append(resp.status_code)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, np.array(latencies) * 1000, np.array(statuses)
+
+
+def run_mode(label, client, batcher, args):
+    stub = StubGenerator(args.overhead_ms, args.per_token_ms, args.batch_penalty, args.tokens)
+    registry.register('chatbot', lambda: stub)
+    chatbot_server.generation_batcher = batcher
+    # Measure generation only: every question must reach the model
+    chatbot_server.answer_cache.clear()
+    chatbot_server.curated_answers = None
+    elapsed, latencies, statuses = run_burst(client, args.clients, args.requests)
+    batcher.stop()
+
+    ok = latencies[statuses == 200]
+    stats = batcher.stats()
+    print(f"{label:<10} {len(ok) / elapsed:7.1f} ans/s  ok {len(ok):4d}  429 {int((statuses == 429).sum()):4d}  "
+          f"p50 {np.percentile(ok, 50):7.0f} ms  p95 {np.percentile(ok, 95):7.0f} ms  "
+          f"queue wait avg {stats['avgWaitMs']:6.0f} / max {stats['maxWaitMs']:6.0f} ms  "
+          f"generate calls {stub.calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=4, help='questions per client')
+    parser.add_argument('--max-batch', type=int, default=chatbot_server.CHATBOT_MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=chatbot_server.CHATBOT_MAX_WAIT_MS)
+    parser.add_argument('--max-queue', type=int, default=chatbot_server.CHATBOT_MAX_QUEUE)
+    parser.add_argument('--overhead-ms', type=float, default=20.0)
+    parser.add_argument('--per-token-ms', type=float, default=2.0)
+    parser.add_argument('--batch-penalty', type=float, default=0.15,
+                        help='extra per-token cost for each additional prompt in a batch')
+    parser.add_argument('--tokens', type=int, default=40, help='tokens generated per answer')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.register_blueprint(chatbot_server.chatbot_bp)
+    client = app.test_client()
+
+    print(f"{args.clients} clients x {args.requests} questions, "
+          f"max batch {args.max_batch}, max wait {args.max_wait_ms:g} ms, max queue {args.max_queue}")
+    run_mode('unbatched', client, MicroBatcher(chatbot_server._generate_batch, 1, 0), args)
+    run_mode('scheduled', client, MicroBatcher(chatbot_server._generate_batch, args.max_batch, args.max_wait_ms,
+                                               max_queue=args.max_queue), args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Load test: latency of GET /api/appointments/doctors while logins hammer bcrypt.
+
+    baseline    no logins at all
+    inline      --storm threads logging in, bcrypt in the request thread
+                (BCRYPT_WORKERS=0, the old behaviour)
+    pool        same storm, bcrypt on the dedicated pool (--workers)
+
+Every storm also runs --brute threads guessing a single email's password;
+past the burst the per-email throttle rejects their attempts with 429
+instead of spending a bcrypt hash on each. The routes' print() logging is
+silenced while a mode runs.
+
+Runs against an in-memory mongomock database (pip install mongomock).
+
+Usage (from backend/):
+    python benchmarks/bench_login_storm.py --storm 8 --workers 1 --seconds 5
+"""
+import argparse
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import mongomock
+import mongoengine
+from flask import Flask
+
+from appointment_models import User, Dermatologist
+from utils.password_hashing import PasswordHasher
+from utils.rate_limit import KeyedRateLimiter
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000 if ordered else 0.0
+
+
+def run_mode(app, auth_routes, workers, storm, brute, seconds, rounds):
+    auth_routes.hasher = PasswordHasher(auth_routes.bcrypt, workers=workers, max_queue=0, rounds=rounds)
+    auth_routes.login_throttle = KeyedRateLimiter(capacity=5, per_minute=5)
+    stop = threading.Event()
+    logins = Counter()
+    latencies = []
+
+    def login(email, password):
+        client = app.test_client()
+        while not stop.is_set():
+            resp = client.post('/api/auth/login', json={'email': email, 'password': password})
+            logins[(email == 'victim@example.com', resp.status_code)] += 1
+
+    threads = [threading.Thread(target=login, args=(f'storm{i}@example.com', 'secret')) for i in range(storm)]
+    if storm:
+        threads += [threading.Thread(target=login, args=('victim@example.com', 'guess')) for _ in range(brute)]
+    for t in threads:
+        t.start()
+
+    client = app.test_client()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        client.get('/api/appointments/doctors')
+        latencies.append(time.perf_counter() - start)
+    stop.set()
+    for t in threads:
+        t.join()
+    return latencies, logins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--storm', type=int, default=8, help='concurrent legitimate login threads')
+    parser.add_argument('--brute', type=int, default=4, help='threads guessing one account password')
+    parser.add_argument('--workers', type=int, default=1, help='bcrypt pool size for the pool mode')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rounds', type=int, default=10, help='bcrypt work factor')
+    args = parser.parse_args()
+
+    mongoengine.connect('skin_app_bench', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    import auth_routes
+    import appointment_routes
+    app = Flask(__name__)
+    app.register_blueprint(auth_routes.auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(appointment_routes.appointment_bp, url_prefix='/api/appointments')
+
+    hashed = PasswordHasher(auth_routes.bcrypt, workers=0, rounds=args.rounds).hash('secret')
+    User.objects.insert([User(name=f'storm{i}', email=f'storm{i}@example.com', password=hashed, role='user')
+                         for i in range(args.storm)] +
+                        [User(name='victim', email='victim@example.com', password=hashed, role='user')])
+    Dermatologist.objects.insert([Dermatologist(name=f'Dr {i}', specialization='Dermatology') for i in range(20)])
+
+    print(f"{'mode':>10}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}{'logins':>10}{'brute 401':>11}{'brute 429':>11}")
+    for label, workers, storm in (('baseline', 0, 0), ('inline', 0, args.storm), ('pool', args.workers, args.storm)):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            latencies, logins = run_mode(app, auth_routes, workers, storm, args.brute, args.seconds, args.rounds)
+        ok = sum(count for (victim, status), count in logins.items() if not victim and status == 200)
+        print(f"{label:>10}{len(latencies):>10}{percentile(latencies, 50):>10.1f}{percentile(latencies, 99):>10.1f}"
+              f"{ok:>10}{logins[(True, 401)]:>11}{logins[(True, 429)]:>11}")
+
+
+if __name__ == '__main__':
+    main()
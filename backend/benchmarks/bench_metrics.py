@@ -0,0 +1,80 @@
+"""
+Microbenchmark: cost of leaving the metrics subsystem on.
+
+    request hooks   before_request + after_request of metrics.init_app():
+                    request histogram and Mongo query count, timed inside
+                    one request context
+    stage timer     one `with stage(...)` block
+    flask request   a full test-client GET of a trivial view, for scale
+
+Each figure is the best of --repeats rounds, since the hooks cost far less
+than the run-to-run noise of a whole request. Also reports how long one
+/metrics scrape takes with --endpoints routes seen.
+
+Usage (from backend/):
+    python benchmarks/bench_metrics.py --iterations 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask, Response
+
+from utils import metrics
+from utils.metrics import stage
+
+
+def best_us(fn, iterations, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - start) / iterations * 1e6)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--endpoints', type=int, default=40, help='distinct routes in the scraped registry')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.add_url_rule('/items/<item_id>', 'item', lambda item_id: 'ok')
+    response = Response('ok')
+
+    def hooks():
+        metrics._start_request()
+        metrics._finish_request(response)
+
+    def timed_stage():
+        with stage('bench', 'stage'):
+            pass
+
+    with app.test_request_context('/items/1') as ctx:
+        ctx.request.url_rule, _ = ctx.url_adapter.match(return_rule=True)
+        hook_us = best_us(hooks, args.iterations, args.repeats)
+    stage_us = best_us(timed_stage, args.iterations, args.repeats)
+    client = app.test_client()
+    request_us = best_us(lambda: client.get('/items/1'), args.iterations // 20, args.repeats)
+
+    print(f"{'request hooks':>16}{'stage timer':>14}{'flask request':>16}   (us, best of {args.repeats})")
+    print(f"{hook_us:>16.2f}{stage_us:>14.2f}{request_us:>16.1f}")
+
+    for i in range(args.endpoints):
+        for status in (200, 404):
+            metrics.REQUEST_SECONDS.observe(0.01, f'/route{i}', 'GET', status)
+    start = time.perf_counter()
+    body = metrics.metrics.render()
+    print(f"/metrics scrape: {(time.perf_counter() - start) * 1000:.2f} ms for {len(body.splitlines())} lines")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Preprocessing throughput (images/sec) against number of worker processes.
+
+Images are read from backend/uploads/ once and fed to the pool as bytes,
+the same way /analyze does with PREPROCESS_WORKERS > 0.
+
+Usage (from backend/):
+    python benchmarks/bench_preprocess_pool.py --images 64
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.preprocessing import preprocess_melanoma_bytes
+from utils.preprocess_pool import PreprocessPool
+
+
+def load_samples(folder, count):
+    names = sorted(n for n in os.listdir(folder) if n.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')))
+    if not names:
+        sys.exit(f"No images found in {folder}")
+    blobs = []
+    for name in names:
+        with open(os.path.join(folder, name), 'rb') as f:
+            blobs.append(f.read())
+    return [blobs[i % len(blobs)] for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=64)
+    parser.add_argument('--folder', default=os.path.join(BACKEND_DIR, 'uploads'))
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    samples = load_samples(args.folder, args.images)
+
+    start = time.perf_counter()
+    for blob in samples:
+        preprocess_melanoma_bytes(blob)
+    inline = args.images / (time.perf_counter() - start)
+    print(f"cores={os.cpu_count()}")
+    print(f"inline     : {inline:7.1f} img/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        with PreprocessPool(workers) as pool:
+            pool.preprocess(samples[0])  # start the workers outside the timing
+            start = time.perf_counter()
+            for _, result in pool.map(samples):
+                if isinstance(result, Exception):
+                    raise result
+            rate = args.images / (time.perf_counter() - start)
+        print(f"workers={workers:<3}: {rate:7.1f} img/s  ({rate / inline:.2f}x inline)")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Microbenchmark: scope classification with a large vocabulary.
+
+Pads the shipped scope_vocabulary.txt with random made-up terms to --terms
+entries (a mix of single words, prefix terms and two-word phrases), then
+times is_in_scope-style checks for typical in-scope and out-of-scope
+questions with:
+
+    loop       the old approach: lowercase + one substring test per term
+    compiled   ScopeFilter: one trie-shaped regex with word boundaries
+
+Usage (from backend/):
+    python benchmarks/bench_scope_filter.py --terms 10000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.scope_filter import ScopeFilter, read_vocabulary
+
+QUESTIONS = [
+    "Is this mole on my back melanoma?",
+    "How should I treat a second degree burn on my hand",
+    "My child has an itchy red rash after playing outside, what could it be?",
+    "How long does a deep wound take to heal and when should I see a doctor about it?",
+    "What is the best pizza place in town",
+    "Can you recommend a good laptop for programming and gaming under 1000 dollars?",
+    "How do I fix a flat bicycle tyre without any special tools at home",
+    "mero chhala ma dag cha ke garne",
+]
+
+
+def build_vocabulary(total, seed=0):
+    rng = random.Random(seed)
+    terms = read_vocabulary(os.path.join(BACKEND_DIR, 'scope_vocabulary.txt'))
+    seen = set(terms)
+    while len(terms) < total:
+        word = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12)))
+        roll = rng.random()
+        if roll < 0.2:
+            word += '*'
+        elif roll < 0.35:
+            word += ' ' + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+        if word not in seen:
+            seen.add(word)
+            terms.append(word)
+    return terms
+
+
+def time_calls(fn, questions, repeat):
+    samples = []
+    for _ in range(repeat):
+        for q in questions:
+            start = time.perf_counter()
+            fn(q)
+            samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--terms', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    terms = build_vocabulary(args.terms)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+        f.write('\n'.join(terms))
+        path = f.name
+    try:
+        start = time.perf_counter()
+        scope = ScopeFilter(path)
+        compile_ms = (time.perf_counter() - start) * 1000
+    finally:
+        os.unlink(path)
+
+    plain = [t.rstrip('*') for t in terms]
+
+    def loop(question):
+        q = question.lower()
+        return any(term in q for term in plain)
+
+    print(f"{len(terms)} terms, {len(QUESTIONS)} questions x {args.repeat}; "
+          f"load + compile {compile_ms:.0f} ms")
+    for label, fn, repeat in [('loop', loop, max(1, args.repeat // 20)), ('compiled', scope, args.repeat)]:
+        us = time_calls(fn, QUESTIONS, repeat)
+        print(f"{label:<9} p50 {np.percentile(us, 50):9.1f} us   p99 {np.percentile(us, 99):9.1f} us   "
+              f"max {us.max():9.1f} us")
+
+    for q in QUESTIONS:
+        print(f"  {'in ' if scope(q) else 'out'}  {q}")
+
+
+if __name__ == '__main__':
+    main()
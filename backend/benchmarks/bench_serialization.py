@@ -0,0 +1,177 @@
+"""
+Microbenchmark: appointment list serialization, old path vs compiled encoders.
+
+    legacy      documents built by mongoengine, getattr-based to_dict(),
+                recursive clean_data(), then json.dumps (what jsonify did)
+    encoders    raw .as_pymongo() rows through the precompiled encoders,
+                dumps() with the stdlib json backend
+    + orjson    same, dumps() through orjson (skipped when not installed)
+    + fields    ?fields=date,time,status: .only() projection, no references
+
+A second table repeats the first three with the rows already in memory,
+isolating encoding and JSON cost from query and document-building cost.
+
+Runs against an in-memory mongomock database (pip install mongomock); the
+query time mongomock adds is part of every row, so compare columns within
+one row rather than with a real server.
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py --sizes 1000 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import mongomock
+import mongoengine
+from bson import ObjectId
+
+from bench_appointment_serialization import seed
+from appointment_models import (User, Dermatologist, Appointment, serialize_appointments, _ref_id,
+                                APPOINTMENT_ENCODER, UNKNOWN_USER, DELETED_DOCTOR)
+from utils import serialization
+
+
+# ----- the pre-encoder implementation, kept here for comparison -----
+
+def clean_data(data):
+    if isinstance(data, list):
+        return [clean_data(item) for item in data]
+    if isinstance(data, dict):
+        return {k: clean_data(v) for k, v in data.items()}
+    if isinstance(data, ObjectId):
+        return str(data)
+    if isinstance(data, datetime):
+        return data.isoformat()
+    return data
+
+
+def legacy_user(u):
+    return clean_data({'id': str(u.id), '_id': str(u.id), 'name': getattr(u, 'name', ''),
+                       'email': getattr(u, 'email', ''), 'role': getattr(u, 'role', 'user')})
+
+
+def legacy_doctor(d):
+    return clean_data({
+        'id': str(d.id), '_id': str(d.id), 'name': getattr(d, 'name', ''),
+        'specialization': getattr(d, 'specialization', ''),
+        'imageUrl': getattr(d, 'imageUrl', "https://via.placeholder.com/150"),
+        'qualification': getattr(d, 'qualification', ''), 'experience': getattr(d, 'experience', 0),
+        'about': getattr(d, 'about', ''), 'rating': getattr(d, 'rating', 5.0),
+        'reviewsCount': getattr(d, 'reviewsCount', 0), 'hourlyRate': getattr(d, 'hourlyRate', 0),
+        'availability': getattr(d, 'availability', [])
+    })
+
+
+def legacy_list(queryset):
+    appointments = list(queryset.no_dereference())
+    refs = [(_ref_id(a._data.get('userId')), _ref_id(a._data.get('dermatologistId'))) for a in appointments]
+    users = {u.pk: legacy_user(u) for u in User.objects(pk__in=list({u for u, _ in refs}))}
+    doctors = {d.pk: legacy_doctor(d) for d in Dermatologist.objects(pk__in=list({d for _, d in refs}))}
+    rows = []
+    for a, (user_id, doctor_id) in zip(appointments, refs):
+        rows.append(clean_data({
+            'id': str(a.id), '_id': str(a.id),
+            'userId': users.get(user_id, UNKNOWN_USER), 'dermatologistId': doctors.get(doctor_id, DELETED_DOCTOR),
+            'date': getattr(a, 'date', ''), 'time': getattr(a, 'time', ''),
+            'status': getattr(a, 'status', 'pending'), 'notes': getattr(a, 'notes', ''),
+            'adminNote': getattr(a, 'adminNote', ''), 'patientName': getattr(a, 'patientName', ''),
+            'phoneNumber': getattr(a, 'phoneNumber', '')
+        }))
+    return json.dumps({'appointments': rows}, sort_keys=True).encode('utf-8')
+
+
+# ----- the encoder path -----
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, default=serialization._default, separators=(',', ':')).encode('utf-8')
+
+
+def encoder_list(queryset, dumps, keys=None):
+    if keys is not None:
+        queryset = queryset.only(*APPOINTMENT_ENCODER.db_fields(keys), 'date', 'time')
+    return dumps({'appointments': serialize_appointments(queryset, keys)})
+
+
+def cpu_only(size, repeats):
+    """Same comparison with the rows already in memory: encoding + JSON only, no queries."""
+    docs = list(Appointment.objects().no_dereference())
+    raws = list(Appointment.objects().as_pymongo())
+    user = legacy_user(User.objects.first())
+    doctor = legacy_doctor(Dermatologist.objects.first())
+    overrides = {'userId': user, 'dermatologistId': doctor}
+
+    def legacy():
+        rows = [clean_data({
+            'id': str(a.id), '_id': str(a.id), 'userId': user, 'dermatologistId': doctor,
+            'date': getattr(a, 'date', ''), 'time': getattr(a, 'time', ''),
+            'status': getattr(a, 'status', 'pending'), 'notes': getattr(a, 'notes', ''),
+            'adminNote': getattr(a, 'adminNote', ''), 'patientName': getattr(a, 'patientName', ''),
+            'phoneNumber': getattr(a, 'phoneNumber', '')}) for a in docs]
+        return json.dumps({'appointments': rows}, sort_keys=True).encode('utf-8')
+
+    def encoded(dumps):
+        return lambda: dumps({'appointments': [APPOINTMENT_ENCODER.encode_raw(r, None, overrides) for r in raws]})
+
+    modes = [('legacy', legacy), ('encoders', encoded(stdlib_dumps))]
+    if serialization.orjson is not None:
+        modes.append(('+ orjson', encoded(lambda obj: serialization.orjson.dumps(obj, default=serialization._default))))
+    return f"{size:>12}" + ''.join(f"{best_ms(fn, repeats)[0]:>14.1f}" for _, fn in modes)
+
+
+def best_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    mongoengine.connect('skin_app_bench', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    fields = APPOINTMENT_ENCODER.project(['date', 'time', 'status'])
+    queryset = lambda: Appointment.objects().order_by('-date', '-time')
+    modes = [
+        ('legacy', lambda: legacy_list(queryset())),
+        ('encoders', lambda: encoder_list(queryset(), stdlib_dumps)),
+    ]
+    if serialization.orjson is not None:
+        orjson_dumps = lambda obj: serialization.orjson.dumps(obj, default=serialization._default)
+        modes.append(('+ orjson', lambda: encoder_list(queryset(), orjson_dumps)))
+        modes.append(('+ fields', lambda: encoder_list(queryset(), orjson_dumps, fields)))
+    else:
+        modes.append(('+ fields', lambda: encoder_list(queryset(), stdlib_dumps, fields)))
+
+    print(f"{'appointments':>12}" + ''.join(f"{label:>14}" for label, _ in modes) + "   (ms, best of "
+          f"{args.repeats}; body KB for the largest size below)")
+    sizes = {}
+    cpu_rows = []
+    for size in args.sizes:
+        seed(size)
+        row = f"{size:>12}"
+        for label, fn in modes:
+            ms, length = best_ms(fn, args.repeats)
+            row += f"{ms:>14.0f}"
+            sizes[label] = length
+        print(row)
+        cpu_rows.append(cpu_only(size, args.repeats))
+    print(f"{'body KB':>12}" + ''.join(f"{sizes[label] / 1024:>14.0f}" for label, _ in modes))
+    print("\nencoding + JSON only, rows already loaded (ms):")
+    print('\n'.join(cpu_rows))
+
+
+if __name__ == '__main__':
+    main()
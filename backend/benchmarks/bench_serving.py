@@ -0,0 +1,164 @@
+"""
+Requests/sec of the production server across worker/thread configurations.
+
+Each configuration starts a real server in a subprocess (gunicorn with
+gunicorn.conf.py, or waitress) and drives three endpoints in turn from
+--clients keep-alive connections for --seconds each:
+
+    /                           trivial view (server + Flask overhead)
+    /api/appointments/doctors   Mongo query + cached JSON response
+    /analyze                    multipart upload + OpenCV preprocessing
+                                (+ the model when its weights are installed)
+
+Configurations are server:WORKERSxTHREADS, e.g. gunicorn:2x4 or waitress:1x8;
+werkzeug:1x1 is the Flask development server main_server.py used to run
+(threaded, debugger and reloader off).
+
+The server runs the real app (wsgi.py; each worker loads its own models)
+on an in-memory mongomock database seeded before the fork, so no MongoDB
+is needed; the load generator shares the machine with the server.
+
+Usage (from backend/):
+    python benchmarks/bench_serving.py --configs werkzeug:1x1 waitress:1x4 gunicorn:1x4 gunicorn:2x2
+"""
+import argparse
+import functools
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def mock_app():
+    """App factory for the server process: the real wsgi app on a shared mongomock store."""
+    import mongomock
+    import mongoengine
+    # One store for every (re)connect, so start_worker() in a worker still sees the seeded data
+    client_class = functools.partial(mongomock.MongoClient, _store=mongomock.store.ServerStore())
+    connect = mongoengine.connect
+    mongoengine.connect = lambda *args, **kwargs: connect('skin_app_bench', host='mongodb://localhost',
+                                                          mongo_client_class=client_class)
+    from wsgi import app
+    from appointment_models import Dermatologist
+    Dermatologist.objects.insert([Dermatologist(name=f'Dr {i}', specialization='Dermatology') for i in range(20)])
+    return app
+
+
+def mock_waitress_app():
+    """waitress does not fork, so its one process runs the worker setup itself (as serve.py does)."""
+    app = mock_app()
+    from wsgi import start_worker
+    start_worker()
+    return app
+
+
+def upload_body(width=600, height=450):
+    import cv2
+    import numpy as np
+    ok, encoded = cv2.imencode('.jpg', np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8))
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="lesion.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n').encode() + encoded.tobytes() + f'\r\n--{boundary}--\r\n'.encode()
+    return body, {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+def start_server(server, workers, threads, port):
+    env = dict(os.environ, WEB_BIND=f'127.0.0.1:{port}', WEB_WORKERS=str(workers), WEB_THREADS=str(threads),
+               SAVE_UPLOADS='0', PYTHONPATH=os.pathsep.join([BENCH_DIR, BACKEND_DIR]))
+    if server == 'gunicorn':
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py'),
+               '--chdir', BACKEND_DIR, 'bench_serving:mock_app()']
+    elif server == 'werkzeug':
+        # What main_server.py ran before (without the debugger and reloader)
+        cmd = [sys.executable, '-c', f"import bench_serving; bench_serving.mock_app().run("
+                                     f"host='127.0.0.1', port={port}, threaded=True)"]
+    else:
+        cmd = [sys.executable, '-m', 'waitress', f'--listen=127.0.0.1:{port}', f'--threads={threads}',
+               '--call', 'bench_serving:mock_waitress_app']
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/')
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"{server} did not start on port {port}")
+
+
+def drive(port, method, path, body, headers, clients, seconds):
+    """(requests/sec, p99 ms, non-2xx count) for one endpoint."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine, failed = [], 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            mine.append(time.perf_counter() - start)
+            failed += resp.status >= 300
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else 0.0
+    return len(latencies) / elapsed, p99, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', nargs='+',
+                        default=['werkzeug:1x1', 'waitress:1x4', 'gunicorn:1x4', 'gunicorn:2x2', 'gunicorn:4x1'])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    image, image_headers = upload_body()
+    endpoints = [('/', 'GET', '/', None, {}),
+                 ('/doctors', 'GET', '/api/appointments/doctors', None, {}),
+                 ('/analyze', 'POST', '/analyze', image, image_headers)]
+    print(f"{'config':>16}" + ''.join(f"{label + ' req/s':>18}{'p99 ms':>9}" for label, *_ in endpoints))
+    for config in args.configs:
+        server, shape = config.split(':')
+        workers, threads = (int(n) for n in shape.split('x'))
+        proc = start_server(server, workers, threads, args.port)
+        try:
+            row = f"{config:>16}"
+            for label, method, path, body, headers in endpoints:
+                rps, p99, errors = drive(args.port, method, path, body, headers, args.clients, args.seconds)
+                row += f"{rps:>18.0f}{p99:>9.1f}" + (f" ({errors} errors)" if errors else '')
+            print(row, flush=True)
+        finally:
+            proc.terminate()
+            proc.wait(30)
+
+
+if __name__ == '__main__':
+    main()
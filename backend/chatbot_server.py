@@ -1,43 +1,212 @@
-from flask import Blueprint, request, jsonify
-from transformers import pipeline, BioGptTokenizer, BioGptForCausalLM
+from flask import Blueprint, request, jsonify, Response
 import os
+import json
+import time
+import threading
+from contextlib import closing
+from utils.model_registry import registry
+from utils.batching import MicroBatcher, QueueFullError
+from utils.answer_cache import AnswerCache, CuratedAnswers
+from utils.scope_filter import ScopeFilter
+from utils.chat_models import load_chat_model
+from utils.metrics import metrics, stage
 
 # Create Blueprint
 chatbot_bp = Blueprint('chatbot_bp', __name__)
 
-MODEL_NAME = "microsoft/biogpt"
+# ----- MODEL SELECTION -----
+# CHATBOT_MODEL is a Hugging Face id or a local checkpoint directory (see
+# export_chat_model.py); CHATBOT_QUANTIZE=int8|bfloat16 shrinks it in memory;
+# CHATBOT_OFFLINE=1 refuses to download anything at startup.
+MODEL_NAME = os.getenv('CHATBOT_MODEL', "microsoft/biogpt")
+CHATBOT_QUANTIZE = os.getenv('CHATBOT_QUANTIZE') or None
+CHATBOT_OFFLINE = os.getenv('CHATBOT_OFFLINE', '0') == '1'
+CHATBOT_THREADS = int(os.getenv('CHATBOT_THREADS', '0')) or None
+
+# ----- GENERATION LIMITS (server side, clients can only ask for less) -----
+CHATBOT_MAX_NEW_TOKENS = int(os.getenv('CHATBOT_MAX_NEW_TOKENS', '150'))
+CHATBOT_MAX_SECONDS = float(os.getenv('CHATBOT_MAX_SECONDS', '30'))
+
+# ----- GENERATION SCHEDULER -----
+# Questions wait at most CHATBOT_MAX_WAIT_MS to be padded into one batch of up
+# to CHATBOT_MAX_BATCH prompts; once CHATBOT_MAX_QUEUE are waiting, new ones
+# get 429 instead of piling up behind a CPU-bound model.
+CHATBOT_MAX_BATCH = int(os.getenv('CHATBOT_MAX_BATCH', '4'))
+CHATBOT_MAX_WAIT_MS = float(os.getenv('CHATBOT_MAX_WAIT_MS', '50'))
+CHATBOT_MAX_QUEUE = int(os.getenv('CHATBOT_MAX_QUEUE', '16'))
+CHATBOT_MAX_STREAMS = int(os.getenv('CHATBOT_MAX_STREAMS', '4'))
+
+# ----- ANSWER CACHE / CURATED ANSWERS -----
+ANSWER_CACHE_SIZE = int(os.getenv('CHATBOT_ANSWER_CACHE_SIZE', '512'))
+ANSWER_CACHE_TTL = float(os.getenv('CHATBOT_ANSWER_CACHE_TTL', '3600'))
+CURATED_ANSWERS_PATH = os.getenv('CHATBOT_CURATED_ANSWERS',
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chatbot_answers.json'))
+CURATED_MATCH_THRESHOLD = float(os.getenv('CHATBOT_CURATED_THRESHOLD', '0.8'))
+
+OUT_OF_SCOPE_ANSWER = "I can only provide information about skin, wounds, and melanoma. For other issues, consult a professional."
+UNAVAILABLE_ANSWER = "The assistant is not available right now. Please try again later."
 
 # ----- SCOPE FOR RULE-BASED CHECK -----
-SCOPE_KEYWORDS = ["skin", "melanoma", "wound", "lesion", "rash", "scar", "burn"]
+# Used only when the vocabulary file is missing
+SCOPE_KEYWORDS = ["skin*", "melanom*", "wound*", "lesion*", "rash", "rashes", "scar", "scars", "burn", "burns"]
+SCOPE_VOCABULARY_PATH = os.getenv('CHATBOT_SCOPE_VOCABULARY',
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scope_vocabulary.txt'))
+SCOPE_RELOAD_SECONDS = float(os.getenv('CHATBOT_SCOPE_RELOAD_SECONDS', '5'))
+
+scope_filter = ScopeFilter(SCOPE_VOCABULARY_PATH, SCOPE_KEYWORDS, SCOPE_RELOAD_SECONDS)
 
 # ----- LOAD MODEL -----
-print("Loading BioGPT model (this may take a minute on CPU)...")
-model = BioGptForCausalLM.from_pretrained(MODEL_NAME)
-tokenizer = BioGptTokenizer.from_pretrained(MODEL_NAME)
+def load_chatbot_model():
+    variant = f"{MODEL_NAME} ({CHATBOT_QUANTIZE or 'float32'})"
+    print(f"Loading chatbot model {variant} (this may take a minute on CPU)...")
+    try:
+        generator = load_chat_model(MODEL_NAME, CHATBOT_QUANTIZE, CHATBOT_OFFLINE, CHATBOT_THREADS)
+    except OSError as e:
+        # Offline and not cached locally, or a bad checkpoint path
+        print(f"[WARNING] Chatbot model {variant} not available: {e}")
+        return None
+    print(f"✅ Chatbot model {variant} ready!")
+    return generator
 
-generator = pipeline("text-generation", model=model, tokenizer=tokenizer)
-print("✅ BioGPT model ready!")
+registry.register('chatbot', load_chatbot_model)
+
+def get_generator():
+    return registry.get('chatbot')
 
 # ----- HELPER FUNCTION -----
 def is_in_scope(question):
-    question_lower = question.lower()
-    for keyword in SCOPE_KEYWORDS:
-        if keyword in question_lower:
-            return True
-    return False
+    return scope_filter(question)
+
+def _generate_batch(questions):
+    """One padded generate() call for a batch of in-scope questions."""
+    generator = get_generator()
+    if generator is None:
+        return [UNAVAILABLE_ANSWER] * len(questions)
+
+    with stage('chatbot', 'model_generate'):
+        outputs = generator(
+            list(questions),
+            batch_size=len(questions),
+            max_new_tokens=CHATBOT_MAX_NEW_TOKENS,
+            num_return_sequences=1,
+            do_sample=True,
+            max_time=CHATBOT_MAX_SECONDS
+        )
+    return [output[0]["generated_text"] for output in outputs]
+
+generation_batcher = MicroBatcher(_generate_batch, max_batch_size=CHATBOT_MAX_BATCH,
+                                  max_wait_ms=CHATBOT_MAX_WAIT_MS, name="chatbot-batcher",
+                                  max_queue=CHATBOT_MAX_QUEUE)
+metrics.gauge('chatbot_queue_depth', 'Questions waiting for the next generate() batch.',
+              lambda: generation_batcher.stats()['queueDepth'])
+
+answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL)
+curated_answers = CuratedAnswers.from_file(CURATED_ANSWERS_PATH, CURATED_MATCH_THRESHOLD)
+
+def curated_stats():
+    stats = curated_answers.stats() if curated_answers is not None else None
+    if stats is not None:
+        # Curated hits skip a generation of about average length
+        stats['timeSavedSeconds'] = round(stats['hits'] * answer_cache.avg_generation_seconds(), 3)
+    return stats
+
+CACHE_GAUGES = (('hits', 'hits', 'Questions answered from the {}.'),
+                ('misses', 'misses', 'Lookups that missed the {}.'),
+                ('hitRate', 'hit_ratio', 'Share of lookups answered from the {}.'),
+                ('timeSavedSeconds', 'time_saved_seconds', 'Generation time saved by the {} (estimated).'))
+
+def register_cache_gauges(source, label, read):
+    """Expose one answer source's stats() on /metrics, read at scrape time like the queue depths."""
+    for key, suffix, help_text in CACHE_GAUGES:
+        metrics.gauge(f'chatbot_{source}_{suffix}', help_text.format(label), lambda key=key: read().get(key, 0))
+
+register_cache_gauges('answer_cache', 'generated-answer cache', lambda: answer_cache.stats())
+register_cache_gauges('curated', 'curated answers', lambda: curated_stats() or {})
+
+def lookup_answer(question):
+    """Curated answer for a frequent question, or None."""
+    if curated_answers is None:
+        return None
+    return curated_answers.lookup(question)
 
 def ask_bot(question):
-    if not is_in_scope(question):
-        return "I can only provide information about skin, wounds, and melanoma. For other issues, consult a professional."
-    
-    output = generator(
-        question,
-        max_length=200,
-        num_return_sequences=1,
-        do_sample=True
-    )
-
-    return output[0]["generated_text"]
+    """Raises QueueFullError when too many questions are already waiting."""
+    with stage('chatbot', 'scope'):
+        in_scope = is_in_scope(question)
+    if not in_scope:
+        return OUT_OF_SCOPE_ANSWER
+
+    with stage('chatbot', 'answer_lookup'):
+        answer = lookup_answer(question) or answer_cache.get(question)
+    if answer is not None:
+        return answer
+
+    start = time.perf_counter()
+    # Includes the wait for a batch slot; model time alone is 'model_generate'
+    with stage('chatbot', 'generate'):
+        answer = generation_batcher(question)
+    if answer != UNAVAILABLE_ANSWER:
+        answer_cache.put(question, answer, time.perf_counter() - start)
+    return answer
+
+def stream_answer(question, max_new_tokens=CHATBOT_MAX_NEW_TOKENS):
+    """
+    Yields pieces of the answer as BioGPT generates them (prompt not repeated).
+    Closing the generator (e.g. the client went away) stops generation.
+    """
+    with stage('chatbot', 'scope'):
+        in_scope = is_in_scope(question)
+    if not in_scope:
+        yield OUT_OF_SCOPE_ANSWER
+        return
+
+    with stage('chatbot', 'answer_lookup'):
+        curated = lookup_answer(question)
+    if curated is not None:
+        yield curated
+        return
+
+    generator = get_generator()
+    if generator is None:
+        yield UNAVAILABLE_ANSWER
+        return
+
+    from transformers import TextIteratorStreamer, StoppingCriteria, StoppingCriteriaList
+
+    cancelled = threading.Event()
+
+    class StopWhenCancelled(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return cancelled.is_set()
+
+    model, tokenizer = generator.model, generator.tokenizer
+    inputs = tokenizer(question, return_tensors="pt")
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                    timeout=CHATBOT_MAX_SECONDS)
+    worker = threading.Thread(target=model.generate, kwargs=dict(
+        **inputs,
+        streamer=streamer,
+        max_new_tokens=min(max_new_tokens, CHATBOT_MAX_NEW_TOKENS),
+        max_time=CHATBOT_MAX_SECONDS,
+        do_sample=True,
+        stopping_criteria=StoppingCriteriaList([StopWhenCancelled()])
+    ), daemon=True)
+    worker.start()
+    try:
+        # The whole streamed generation (runs after the request's own timing has ended)
+        with stage('chatbot', 'generate'):
+            for text in streamer:
+                if text:
+                    yield text
+    finally:
+        cancelled.set()
+
+stream_slots = threading.BoundedSemaphore(max(1, CHATBOT_MAX_STREAMS))
+
+def too_busy(retry_after):
+    response = jsonify({"error": "The assistant is busy, please retry shortly", "retryAfter": retry_after})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, 429
 
 # ----- ROUTE USING BLUEPRINT -----
 @chatbot_bp.route("/chatbot", methods=["POST"])
@@ -48,5 +217,51 @@ def chatbot():
     if question.strip() == "":
         return jsonify({"error": "No question provided"}), 400
 
-    answer = ask_bot(question)
+    try:
+        answer = ask_bot(question)
+    except QueueFullError as e:
+        return too_busy(e.retry_after)
     return jsonify({"answer": answer})
+
+@chatbot_bp.route("/chatbot/stream", methods=["POST"])
+def chatbot_stream():
+    """Server-sent events: one 'data' event per generated piece, then 'done'."""
+    data = request.get_json() or {}
+    question = data.get("question", "")
+
+    if question.strip() == "":
+        return jsonify({"error": "No question provided"}), 400
+
+    try:
+        max_new_tokens = int(data.get("max_new_tokens", CHATBOT_MAX_NEW_TOKENS))
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_new_tokens must be an integer"}), 400
+
+    # Each stream holds its own generate() thread, so cap how many run at once
+    if not stream_slots.acquire(blocking=False):
+        return too_busy(generation_batcher.estimated_wait())
+
+    def events():
+        # closing() stops generation as soon as the server drops this stream
+        with closing(stream_answer(question, max(1, max_new_tokens))) as pieces:
+            try:
+                for piece in pieces:
+                    yield f"data: {json.dumps({'token': piece})}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    response = Response(events(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(stream_slots.release)
+    return response
+
+@chatbot_bp.route("/chatbot/stats", methods=["GET"])
+def chatbot_stats():
+    """Generation queue, answer cache and curated-answer hit rates."""
+    return jsonify({
+        "scheduler": generation_batcher.stats(),
+        "answerCache": answer_cache.stats(),
+        "curatedAnswers": curated_stats(),
+        "scopeFilter": scope_filter.stats()
+    })
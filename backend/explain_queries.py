@@ -0,0 +1,133 @@
+"""
+Run explain() on every query the API routes issue and flag collection scans.
+
+Uses a real document from each collection for the lookup values, so run it
+against a database with some data in it:
+
+    python explain_queries.py            # uses MONGO_URI from .env
+
+Exits with status 1 if a query that should be served by an index falls
+back to a COLLSCAN.
+"""
+import os
+import sys
+
+import mongoengine
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from appointment_models import (User, Dermatologist, Appointment, ACTIVE_STATUSES, ensure_indexes, _ref_id,
+                                make_slot_key)
+from appointment_routes import APPOINTMENT_ORDER
+from auth_routes import USER_ORDER
+from utils.pagination import keyset_filter, order_by_args, DEFAULT_PAGE_SIZE
+
+
+class Aggregate:
+    """An aggregation pipeline with the same explain() as a queryset."""
+
+    def __init__(self, document, pipeline):
+        self.document = document
+        self.pipeline = pipeline
+
+    def explain(self):
+        collection = self.document._get_collection()
+        return collection.database.command('explain', {
+            'aggregate': collection.name, 'pipeline': self.pipeline, 'cursor': {}}, verbosity='queryPlanner')
+
+
+def keyset_page(queryset, order, last):
+    """The query paginate() runs for the page after the row whose sort key is last."""
+    queryset = queryset.order_by(*order_by_args(order)).limit(DEFAULT_PAGE_SIZE + 1)
+    return queryset.filter(keyset_filter(order, last))
+
+
+def route_queries():
+    """(route, description, queryset, collection scan expected?)"""
+    appt = Appointment.objects.no_dereference().first()
+    user = User.objects.first()
+    doctor_id = _ref_id(appt._data.get('dermatologistId')) if appt else ObjectId()
+    user_id = user.id if user else ObjectId()
+    appt_id = appt.id if appt else ObjectId()
+    date = appt.date if appt else '2024-01-01'
+    time = appt.time if appt else '09:00'
+    email = user.email if user else 'nobody@example.com'
+    name = user.name if user else ''
+    last_appt = [date, time, appt_id]
+
+    calendar = [{'$match': {'dermatologistId': {'$in': [doctor_id]}, 'date': {'$gte': date, '$lte': date},
+                            'status': {'$in': ACTIVE_STATUSES}}},
+                {'$group': {'_id': {'doctor': '$dermatologistId', 'date': '$date'}, 'times': {'$push': '$time'}}}]
+
+    return [
+        ('GET /doctors', 'all dermatologists', Dermatologist.objects.all(), True),
+        ('GET /doctors/<id>/slots', 'doctor by id', Dermatologist.objects(id=doctor_id), False),
+        ('GET /doctors/<id>/slots', 'booked slots',
+         Appointment.objects(dermatologistId=doctor_id, date=date, status__in=ACTIVE_STATUSES).only('time'), False),
+        ('GET /doctors/calendar', 'booked slots in range', Aggregate(Appointment, calendar), False),
+        # /book and re-approval insert/save; the unique slotKey index is the conflict check
+        ('POST /book', 'slotKey uniqueness',
+         Appointment.objects(slotKey=make_slot_key(doctor_id, date, time)), False),
+        ('GET /my', 'user history', Appointment.objects(userId=user_id).order_by('-date', '-time'), False),
+        ('GET /my?cursor=', 'user history page',
+         keyset_page(Appointment.objects(userId=user_id), APPOINTMENT_ORDER, last_appt), False),
+        ('GET /admin/pending', 'pending list', Appointment.objects(status='pending').order_by('-date', '-time'), False),
+        ('GET /admin/pending?cursor=', 'pending page',
+         keyset_page(Appointment.objects(status='pending'), APPOINTMENT_ORDER, last_appt), False),
+        ('GET /admin/all', 'full history (sorted)', Appointment.objects().order_by('-date', '-time'), False),
+        ('GET /admin/all?cursor=', 'history page',
+         keyset_page(Appointment.objects(), APPOINTMENT_ORDER, last_appt), False),
+        ('DELETE /<id>', 'appointment by id', Appointment.objects(id=appt_id), False),
+        ('PUT /admin/status/<id>', 'appointment by id', Appointment.objects(id=appt_id), False),
+        ('POST /auth/login', 'user by email', User.objects(email=email), False),
+        ('POST /auth/register-admin', 'admin count', User.objects(role='admin'), False),
+        ('GET /auth/users', 'users by name', User.objects().order_by('name'), False),
+        ('GET /auth/users?cursor=', 'users page', keyset_page(User.objects(), USER_ORDER, [name, user_id]), False),
+    ]
+
+
+def plan_stages(plan):
+    """All stage names in a (possibly nested) explain plan."""
+    if isinstance(plan, dict):
+        stages = [plan['stage']] if 'stage' in plan else []
+        for key in ('inputStage', 'queryPlan', 'winningPlan'):
+            if key in plan:
+                stages += plan_stages(plan[key])
+        for child in plan.get('inputStages', []):
+            stages += plan_stages(child)
+        return stages
+    return []
+
+
+def winning_plan(explain):
+    """The query's winning plan; an aggregate's sits under its first ($cursor) stage on older servers."""
+    if 'queryPlanner' not in explain and explain.get('stages'):
+        explain = explain['stages'][0].get('$cursor', {})
+    return explain.get('queryPlanner', {}).get('winningPlan', {})
+
+
+def main():
+    load_dotenv()
+    mongoengine.connect(host=os.getenv('MONGO_URI'))
+    ensure_indexes()
+
+    problems = 0
+    print(f"{'route':<28} {'query':<24} {'plan':<40} result")
+    for route, label, queryset, scan_expected in route_queries():
+        stages = plan_stages(winning_plan(queryset.explain()))
+        collscan = 'COLLSCAN' in stages
+        if collscan and not scan_expected:
+            verdict = 'COLLSCAN  <-- needs an index'
+            problems += 1
+        elif collscan:
+            verdict = 'COLLSCAN (full listing, expected)'
+        else:
+            verdict = 'ok'
+        print(f"{route:<28} {label:<24} {' > '.join(stages)[:40]:<40} {verdict}")
+
+    print(f"\n{problems} unexpected collection scan(s)")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
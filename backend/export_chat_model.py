@@ -0,0 +1,46 @@
+"""
+Save the chatbot model to a local directory so workers start without network.
+
+    python export_chat_model.py                                  # microsoft/biogpt -> ai_models/biogpt
+    python export_chat_model.py --bfloat16                       # half-size weights on disk
+    python export_chat_model.py --model some/distilled-biogpt -o ai_models/biogpt-small
+    python export_chat_model.py --tiny -o ai_models/biogpt-tiny  # random 2-layer stand-in for tests
+
+Serve the result with CHATBOT_MODEL=<directory> (optionally CHATBOT_OFFLINE=1,
+and CHATBOT_QUANTIZE=int8 to quantize the Linear layers at load time).
+"""
+import os
+import sys
+import argparse
+
+from chatbot_server import MODEL_NAME
+from utils.chat_models import save_local_checkpoint, build_tiny_checkpoint
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def directory_size_mb(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names) / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=MODEL_NAME, help='Hugging Face id or local checkpoint')
+    parser.add_argument('-o', '--output', default=os.path.join(BASE_DIR, 'ai_models', 'biogpt'))
+    parser.add_argument('--bfloat16', action='store_true', help='store weights as bfloat16')
+    parser.add_argument('--tiny', action='store_true', help='write a random tiny BioGPT instead')
+    args = parser.parse_args(argv)
+
+    if args.tiny:
+        build_tiny_checkpoint(args.output)
+        source = 'tiny random BioGPT'
+    else:
+        save_local_checkpoint(args.model, args.output, args.bfloat16)
+        source = args.model
+    print(f"Saved {source} -> {args.output} ({directory_size_mb(args.output):.1f} MB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
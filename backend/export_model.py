@@ -0,0 +1,118 @@
+"""
+Export ai_models/mela_model_final.keras to a lighter CPU inference format.
+
+    python export_model.py --format tflite                      # float32 .tflite
+    python export_model.py --format tflite --quantize float16   # half-size weights
+    python export_model.py --format tflite --quantize int8      # int8, calibrated on uploads/
+    python export_model.py --format onnx                        # needs tf2onnx
+
+Every export is checked against the Keras model on sample images from
+uploads/ (top-1 agreement and max probability difference) unless
+--no-verify is given. Serve the result with INFERENCE_BACKEND=tflite|onnx
+(and INFERENCE_QUANTIZE=float16|int8 for quantized variants).
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+
+from app import MODEL_PATH, UPLOAD_FOLDER
+from utils.inference_backends import exported_path, load_backend
+from utils.batch_preprocess import list_image_sources, iter_preprocessed_chunks
+
+
+def sample_images(source, limit):
+    """Up to limit preprocessed, normalized images for calibration and verification."""
+    sources = list_image_sources(source)[:limit]
+    chunks = [images.astype(np.float32) / 255.0
+              for _, images, _ in iter_preprocessed_chunks(sources, chunk_size=32) if len(images)]
+    if not chunks:
+        return np.zeros((0, 224, 224, 3), dtype=np.float32)
+    return np.concatenate(chunks)
+
+
+def export_tflite(model, out_path, quantize, calibration):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == 'int8':
+        if not len(calibration):
+            raise SystemExit("int8 quantization needs calibration images (none found)")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([img[None]] for img in calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        # Keep float32 in/out so callers feed the same normalized images
+        converter.inference_input_type = tf.float32
+        converter.inference_output_type = tf.float32
+    with open(out_path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def export_onnx(model, out_path, quantize):
+    import tensorflow as tf
+    try:
+        import tf2onnx
+    except ImportError:
+        raise SystemExit("ONNX export needs tf2onnx (pip install tf2onnx onnxruntime)")
+
+    spec = (tf.TensorSpec((None, 224, 224, 3), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, output_path=out_path)
+    if quantize == 'int8':
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(out_path, out_path, weight_type=QuantType.QInt8)
+    elif quantize == 'float16':
+        import onnx
+        from onnxconverter_common import float16
+        onnx.save(float16.convert_float_to_float16(onnx.load(out_path), keep_io_types=True), out_path)
+
+
+def verify(reference, backend, path, images):
+    """Compare exported model predictions against the Keras model."""
+    if not len(images):
+        print("[WARNING] No sample images to verify against")
+        return True
+    exported = load_backend(backend, path)
+    expected = reference.predict(images, verbose=0)
+    actual = np.concatenate([exported.predict(images[i:i + 16]) for i in range(0, len(images), 16)])
+    agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    max_diff = float(np.abs(expected - actual).max())
+    print(f"Verification on {len(images)} images: top-1 agreement {agreement * 100:.1f}%, "
+          f"max probability difference {max_diff:.4f}")
+    return agreement >= 0.98
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', choices=['tflite', 'onnx'], default='tflite')
+    parser.add_argument('--quantize', choices=['float16', 'int8'])
+    parser.add_argument('--model', default=MODEL_PATH, help='source .keras file')
+    parser.add_argument('-o', '--output', help='output file (default: next to the .keras file)')
+    parser.add_argument('--samples', default=UPLOAD_FOLDER, help='images for calibration/verification')
+    parser.add_argument('--num-samples', type=int, default=200)
+    parser.add_argument('--no-verify', action='store_true')
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(args.model)
+    out_path = args.output or exported_path(args.model, args.format, args.quantize)
+    images = sample_images(args.samples, args.num_samples)
+
+    if args.format == 'tflite':
+        export_tflite(model, out_path, args.quantize, images)
+    else:
+        export_onnx(model, out_path, args.quantize)
+    print(f"Exported {args.model} -> {out_path} ({os.path.getsize(out_path) / 1e6:.1f} MB)")
+
+    if not args.no_verify and not verify(model, args.format, out_path, images):
+        print("[ERROR] Exported model disagrees with the Keras model on more than 2% of samples")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
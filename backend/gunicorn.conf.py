@@ -0,0 +1,41 @@
+# gunicorn settings for the backend; every value can be set from the environment.
+#
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Graceful restart:
+#   kill -HUP <master pid>    new workers replace the old ones; in-flight requests
+#                             finish within WEB_GRACEFUL_TIMEOUT and each new worker
+#                             loads the model files afresh. The preloaded app code is
+#                             kept, so this does not pick up new code.
+#   kill -USR2 <master pid>   start a new master from the current code next to the old
+#                             one, then kill -QUIT the old master once the new one serves.
+#   kill -TERM <master pid>   graceful shutdown.
+import os
+
+bind = os.getenv('WEB_BIND', '0.0.0.0:3000')
+
+# Each worker is a process holding its own models, inference batcher and caches;
+# threads share them. preload_app imports the app (read-only tables, no models)
+# once in the master so that state is shared copy-on-write; see wsgi.py.
+workers = int(os.getenv('WEB_WORKERS', '2'))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = True
+
+# /chatbot may generate for up to CHATBOT_MAX_SECONDS and /chatbot/stream holds the connection
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+# Recycle workers after this many requests (0 = never), jittered so they do not restart together
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+pidfile = os.getenv('WEB_PIDFILE') or None
+accesslog = os.getenv('WEB_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    from wsgi import start_worker
+    start_worker()
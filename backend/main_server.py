@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 import sys
@@ -18,12 +18,29 @@ from app import image_bp
 from chatbot_server import chatbot_bp
 from appointment_routes import appointment_bp
 from auth_routes import auth_bp
+from utils.model_registry import registry
+from appointment_models import ensure_indexes
+from utils import metrics
 
 app = Flask(__name__)
 CORS(app)
 
-# Database Config
-mongoengine.connect(host=os.getenv('MONGO_URI'))
+# Request histograms for every blueprint plus the /metrics endpoint
+metrics.init_app(app)
+
+# Database Config (the listener counts Mongo commands per request)
+def connect_db():
+    """(Re)connect mongoengine. Forked WSGI workers call it again: a MongoClient must not cross a fork."""
+    mongoengine.disconnect()
+    mongoengine.connect(host=os.getenv('MONGO_URI'), event_listeners=[metrics.mongo_queries])
+
+connect_db()
+
+# Create declared indexes up front instead of on first query
+try:
+    ensure_indexes()
+except Exception as e:
+    print(f"[WARNING] Could not create indexes at startup: {e}")
 
 # Register Blueprints
 app.register_blueprint(image_bp) # Keep as is for now
@@ -35,7 +52,24 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 def home():
     return "Main Flask Server Running Successfully!"
 
+@app.route('/health')
+def health():
+    # Models load lazily, so report each one instead of blocking on them
+    models = registry.status()
+    return jsonify({
+        'status': 'ok',
+        'modelsReady': all(m['ready'] for m in models.values()),
+        'models': models
+    }), 200
+
+# Set WARM_MODELS=1 to load models in the background right after startup
+WARM_MODELS = os.getenv('WARM_MODELS', '0') == '1'
+
+# Development server only; production runs wsgi.py (see serve.py)
 if __name__ == "__main__":
+    # With the reloader on, only the serving child process should warm models
+    if WARM_MODELS and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        registry.warm_async()
     app.run(host='0.0.0.0', port=3000, debug=True)
 
 
@@ -0,0 +1,134 @@
+"""
+Re-score stored uploads with the current (or a candidate) melanoma model.
+
+Streams every image in backend/uploads/ through the same preprocessing and
+CLASS_LABELS used by /analyze, runs the model in large batches and appends
+one CSV row per image. Re-running with the same output file resumes where
+the previous run stopped.
+
+Usage (from backend/):
+    python rescore_uploads.py -o rescore.csv
+    python rescore_uploads.py -o rescore_new.csv --model ai_models/new.keras --compare rescore.csv
+    python rescore_uploads.py -o rescore.csv --parquet rescore.parquet
+"""
+import os
+import sys
+import csv
+import time
+import argparse
+from collections import Counter
+
+import numpy as np
+
+import app
+from app import CLASS_LABELS, UPLOAD_FOLDER, get_model
+from utils.batch_preprocess import list_image_sources, iter_preprocessed_chunks
+
+FIELDS = ['filename', 'prediction', 'confidence'] + [f"p_{i}" for i in range(len(CLASS_LABELS))]
+
+
+def load_done(path):
+    """Filenames already scored in an earlier (possibly interrupted) run."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='') as f:
+        return {row['filename'] for row in csv.DictReader(f)}
+
+
+def read_predictions(path):
+    with open(path, newline='') as f:
+        return {row['filename']: row['prediction'] for row in csv.DictReader(f)}
+
+
+def summarize(path, elapsed, scored, errors):
+    predictions = read_predictions(path)
+    print(f"\nScored {scored} new images in {elapsed:.1f}s "
+          f"({scored / max(elapsed, 1e-9):.1f} img/s), {errors} failed, {len(predictions)} total in {path}")
+    print("Per-class distribution:")
+    counts = Counter(predictions.values())
+    for label in CLASS_LABELS:
+        share = counts[label] / len(predictions) * 100 if predictions else 0.0
+        print(f"  {label:<32} {counts[label]:>7}  {share:5.1f}%")
+    return predictions
+
+
+def compare(new, old_path):
+    old = read_predictions(old_path)
+    common = sorted(set(new) & set(old))
+    if not common:
+        print(f"\nNo images in common with {old_path}")
+        return
+    changed = Counter((old[n], new[n]) for n in common if old[n] != new[n])
+    agree = len(common) - sum(changed.values())
+    print(f"\nAgreement with {old_path}: {agree}/{len(common)} ({agree / len(common) * 100:.1f}%)")
+    for (before, after), count in changed.most_common(10):
+        print(f"  {before} -> {after}: {count}")
+
+
+def write_parquet(csv_path, parquet_path):
+    try:
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("[WARNING] pyarrow is not installed; skipping Parquet export")
+        return
+    pq.write_table(pa_csv.read_csv(csv_path), parquet_path)
+    print(f"Wrote {parquet_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', required=True, help='results CSV (appended to on resume)')
+    parser.add_argument('--source', default=UPLOAD_FOLDER, help='directory, glob or zip (default: uploads/)')
+    parser.add_argument('--model', help='score with this .keras file instead of ai_models/mela_model_final.keras')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--compare', help='earlier results CSV to compare predictions against')
+    parser.add_argument('--parquet', help='also export the results as Parquet (needs pyarrow)')
+    args = parser.parse_args(argv)
+
+    if args.model:
+        app.MODEL_PATH = os.path.abspath(args.model)
+    model = get_model()
+    if model is None:
+        print(f"[ERROR] No model available at {app.MODEL_PATH}")
+        return 1
+
+    done = load_done(args.output)
+    sources = [s for s in list_image_sources(args.source) if s[0] not in done]
+    print(f"{len(done)} images already scored, {len(sources)} to go")
+
+    scored = errors = 0
+    start = time.perf_counter()
+    new_file = not os.path.exists(args.output)
+    with open(args.output, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new_file:
+            writer.writeheader()
+        for names, images, chunk_errors in iter_preprocessed_chunks(sources, args.batch_size):
+            for name, error in chunk_errors:
+                print(f"[ERROR] {name}: {error}")
+            errors += len(chunk_errors)
+            if not names:
+                continue
+            probs = model.predict(images.astype('float32') / 255.0, verbose=0)
+            for name, row in zip(names, probs):
+                class_idx = int(np.argmax(row))
+                record = {'filename': name, 'prediction': CLASS_LABELS[class_idx],
+                          'confidence': round(float(row[class_idx]) * 100, 2)}
+                record.update({f"p_{i}": f"{p:.6f}" for i, p in enumerate(row)})
+                writer.writerow(record)
+            # Flush per batch so an interrupted run can resume from here
+            f.flush()
+            scored += len(names)
+            print(f"  {scored}/{len(sources)} scored ({scored / (time.perf_counter() - start):.1f} img/s)")
+
+    predictions = summarize(args.output, time.perf_counter() - start, scored, errors)
+    if args.compare:
+        compare(predictions, args.compare)
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
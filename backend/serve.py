@@ -0,0 +1,61 @@
+"""
+Run the backend under a production server.
+
+    python serve.py                     gunicorn with gunicorn.conf.py when it is
+                                        installed (Linux/macOS), else waitress
+    python serve.py --server waitress   force waitress (one process, WEB_THREADS threads)
+
+Settings come from the environment: WEB_BIND, WEB_WORKERS, WEB_THREADS,
+WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_MAX_REQUESTS, WSGI_WARM_MODELS
+(see gunicorn.conf.py). `python main_server.py` remains the debug server.
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONFIG = os.path.join(BACKEND_DIR, 'gunicorn.conf.py')
+
+
+def gunicorn_available():
+    try:
+        import gunicorn  # noqa: F401  (not available on Windows)
+    except ImportError:
+        return False
+    return True
+
+
+def run_gunicorn(extra_args):
+    from gunicorn.app.wsgiapp import run
+    sys.argv = ['gunicorn', '-c', GUNICORN_CONFIG, '--chdir', BACKEND_DIR] + extra_args + ['wsgi:app']
+    run()
+
+
+def run_waitress():
+    from waitress import serve
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    from wsgi import app, start_worker
+    # waitress has no worker processes: one process, a pool of WEB_THREADS threads
+    start_worker()
+    serve(app, listen=os.getenv('WEB_BIND', '0.0.0.0:3000'), threads=int(os.getenv('WEB_THREADS', '4')),
+          channel_timeout=int(os.getenv('WEB_TIMEOUT', '120')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'waitress'), default='auto')
+    args, extra = parser.parse_known_args()
+
+    server = args.server
+    if server == 'auto':
+        server = 'gunicorn' if gunicorn_available() else 'waitress'
+    if server == 'gunicorn':
+        # Anything not recognised here (e.g. --workers 4) is passed on to gunicorn
+        run_gunicorn(extra)
+    else:
+        run_waitress()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import os
+import time
+
+from utils.answer_cache import AnswerCache, CuratedAnswers, normalize_question
+
+
+def test_normalized_variants_share_an_entry():
+    cache = AnswerCache(max_entries=10, ttl=0)
+    cache.put('Is this mole melanoma?', 'answer', 2.0)
+    assert normalize_question('  is THIS mole,   melanoma ') == 'is this mole melanoma'
+    assert cache.get('is this mole melanoma') == 'answer'
+    assert cache.stats()['timeSavedSeconds'] == 2.0
+
+
+def test_lru_eviction_and_ttl():
+    cache = AnswerCache(max_entries=2, ttl=0.05)
+    cache.put('a', 1, 0.1)
+    cache.put('b', 2, 0.1)
+    cache.get('a')
+    cache.put('c', 3, 0.1)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    time.sleep(0.06)
+    assert cache.get('c') is None
+    stats = cache.stats()
+    assert stats['expired'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 2
+
+
+def test_curated_answers_match_reworded_questions():
+    curated = CuratedAnswers([
+        {'questions': ['how to treat a burn', 'first aid for a burn'], 'answer': 'cool it'},
+        {'question': 'is this mole melanoma', 'answer': 'see a dermatologist'},
+    ], threshold=0.8)
+
+    assert curated.lookup('How do I treat a burn?') == 'cool it'
+    assert curated.lookup('is this mol melanoma') == 'see a dermatologist'
+    assert curated.lookup('what is eczema') is None
+    assert curated.stats()['hits'] == 2
+
+
+def test_near_miss_questions_do_not_borrow_a_curated_answer():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'chatbot_answers.json')
+    curated = CuratedAnswers.from_file(path)
+    burn_answer = curated.lookup('how to treat a burn')
+    assert burn_answer.startswith('Cool a minor burn')
+
+    # An extra qualifier changes the medical question; these must reach the model
+    for question in ('how to treat a burn scar', 'how do i clean a burn', 'how to treat a chemical burn',
+                     'how to treat a burn on my eye', 'is this mole not melanoma', 'melanoma'):
+        assert curated.lookup(question) is None, question
+
+    assert curated.lookup('How do I clean a wound?').startswith('Wash your hands')
+    assert curated.lookup('how to fade scars').startswith('Most scars fade')
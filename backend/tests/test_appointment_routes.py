@@ -0,0 +1,193 @@
+import pytest
+from flask import Flask
+
+mongomock = pytest.importorskip('mongomock')
+import mongoengine
+
+from appointment_models import Dermatologist, Appointment, User
+
+
+@pytest.fixture
+def client():
+    mongoengine.disconnect()
+    mongoengine.connect('skin_app_test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    import appointment_routes
+    appointment_routes.invalidate_doctors_cache()
+
+    app = Flask(__name__)
+    app.register_blueprint(appointment_routes.appointment_bp, url_prefix='/api/appointments')
+    yield app.test_client()
+    mongoengine.disconnect()
+
+
+def test_doctors_etag_and_invalidation(client):
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology').save()
+
+    first = client.get('/api/appointments/doctors')
+    assert first.status_code == 200
+    assert [d['name'] for d in first.get_json()] == ['Dr. A']
+
+    etag = first.headers['ETag']
+    assert client.get('/api/appointments/doctors', headers={'If-None-Match': etag}).status_code == 304
+
+    doctor.name = 'Dr. B'
+    doctor.save()
+    changed = client.get('/api/appointments/doctors', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.get_json()[0]['name'] == 'Dr. B'
+
+
+def test_bulk_serialization_matches_to_dict(client):
+    from appointment_models import serialize_appointments
+
+    user = User(name='Pat', email='pat@example.com', password='x').save()
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology').save()
+    gone = Dermatologist(name='Dr. Gone', specialization='Dermatology').save()
+    Appointment(userId=user, dermatologistId=doctor, date='2024-05-01', time='10:00').save()
+    Appointment(userId=user, dermatologistId=gone, date='2024-05-02', time='11:00').save()
+    gone.delete()
+
+    queryset = Appointment.objects().order_by('-date', '-time')
+    bulk = serialize_appointments(queryset)
+    assert bulk == [a.to_dict() for a in queryset]
+    assert bulk[0]['dermatologistId']['name'] == 'Deleted Doctor'
+    assert bulk[1]['userId']['email'] == 'pat@example.com'
+
+
+def test_admin_history_keyset_pages_and_ndjson(client):
+    import json
+
+    user = User(name='Pat', email='pat@example.com', password='x').save()
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology').save()
+    for day in range(1, 6):
+        for time in ('09:00', '10:00'):
+            Appointment(userId=user, dermatologistId=doctor, date=f'2024-05-0{day}', time=time).save()
+    history = client.get('/api/appointments/admin/all', headers=_admin_header()).get_json()['appointments']
+    expected = [(a['date'], a['time']) for a in history]
+
+    seen, cursor = [], None
+    while True:
+        query = '?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(f'/api/appointments/admin/all{query}', headers=_admin_header()).get_json()
+        seen.extend((a['date'], a['time']) for a in page['appointments'])
+        cursor = page['nextCursor']
+        if not cursor:
+            break
+    assert seen == expected
+
+    streamed = client.get('/api/appointments/admin/all?format=ndjson', headers=_admin_header())
+    rows = [json.loads(line) for line in streamed.get_data(as_text=True).splitlines()]
+    assert [(r['date'], r['time']) for r in rows] == expected
+    assert client.get('/api/appointments/admin/all?cursor=garbage', headers=_admin_header()).status_code == 400
+
+
+def _auth_header(user):
+    from utils.auth import issue_token
+    token = issue_token({'id': str(user.id), 'email': user.email, 'role': user.role})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _admin_header():
+    from utils.auth import issue_token
+    return {'Authorization': 'Bearer ' + issue_token({'id': 'admin', 'email': 'admin@example.com', 'role': 'admin'})}
+
+
+def test_booking_a_taken_slot_conflicts_until_cancelled(client):
+    Appointment.ensure_indexes()
+    alice = User(name='Alice', email='alice@example.com', password='x').save()
+    bob = User(name='Bob', email='bob@example.com', password='x').save()
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology').save()
+    slot = {'dermatologistId': str(doctor.id), 'date': '2024-06-03', 'time': '10:00'}
+
+    first = client.post('/api/appointments/book', json=slot, headers=_auth_header(alice))
+    assert first.status_code == 201
+    assert client.post('/api/appointments/book', json=slot, headers=_auth_header(bob)).status_code == 409
+
+    appt_id = first.get_json()['appointment']['id']
+    assert client.delete(f'/api/appointments/{appt_id}').status_code == 401
+    # Only the patient who booked it (or an admin) may cancel
+    assert client.delete(f'/api/appointments/{appt_id}', headers=_auth_header(bob)).status_code == 403
+    assert client.delete(f'/api/appointments/{appt_id}', headers=_auth_header(alice)).status_code == 200
+    assert client.post('/api/appointments/book', json=slot, headers=_auth_header(bob)).status_code == 201
+
+
+def test_calendar_matches_per_day_slots(client):
+    user = User(name='Pat', email='pat@example.com', password='x').save()
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology', availability=[
+        {'day': 'Monday', 'timeSlots': ['09:00', '10:00', '11:00']},
+        {'day': 'Wednesday', 'timeSlots': ['14:00']}
+    ]).save()
+    Appointment(userId=user, dermatologistId=doctor, date='2024-06-03', time='10:00').save()
+    Appointment(userId=user, dermatologistId=doctor, date='2024-06-03', time='11:00', status='cancelled').save()
+
+    resp = client.get(f'/api/appointments/doctors/{doctor.id}/calendar?start=2024-06-03&end=2024-06-09')
+    assert resp.status_code == 200
+    days = resp.get_json()['days']
+    assert len(days) == 7
+    for day in days:
+        single = client.get(f"/api/appointments/doctors/{doctor.id}/slots?date={day['date']}").get_json()
+        assert day['availableSlots'] == single['availableSlots']
+        assert day['bookedSlots'] == single['bookedSlots']
+    assert days[0]['availableSlots'] == ['09:00', '11:00']
+
+    everyone = client.get('/api/appointments/doctors/calendar?start=2024-06-03').get_json()
+    assert len(everyone['doctors'][0]['days']) == 14
+    assert client.get('/api/appointments/doctors/calendar?start=2024-06-03&end=2024-01-01').status_code == 400
+
+
+def test_fields_projection_trims_rows_and_query(client, monkeypatch):
+    user = User(name='Pat', email='pat@example.com', password='x').save()
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology').save()
+    for day in range(1, 4):
+        Appointment(userId=user, dermatologistId=doctor, date=f'2024-05-0{day}', time='09:00').save()
+
+    loaded = []
+    original_only = type(Appointment.objects()).only
+
+    def spy_only(self, *fields):
+        loaded.append(set(fields))
+        return original_only(self, *fields)
+
+    monkeypatch.setattr(type(Appointment.objects()), 'only', spy_only)
+    rows = client.get('/api/appointments/admin/all?fields=date,status', headers=_admin_header()).get_json()['appointments']
+    assert [set(r) for r in rows] == [{'id', '_id', 'date', 'status'}] * 3
+    assert rows[0]['date'] == '2024-05-03'
+    assert loaded == [{'date', 'status', 'time'}]
+
+    page = client.get('/api/appointments/admin/all?fields=userId&limit=2', headers=_admin_header()).get_json()
+    assert page['appointments'][0]['userId']['email'] == 'pat@example.com'
+    assert page['nextCursor']
+
+    assert client.get('/api/appointments/admin/all?fields=password', headers=_admin_header()).status_code == 400
+
+
+def test_admin_routes_check_role(client):
+    user = User(name='Pat', email='pat@example.com', password='x', role='user').save()
+
+    assert client.get('/api/appointments/admin/all').status_code == 401
+    assert client.get('/api/appointments/admin/all', headers={'Authorization': 'Bearer junk'}).status_code == 401
+    assert client.get('/api/appointments/admin/pending', headers=_auth_header(user)).status_code == 403
+    assert client.get('/api/appointments/admin/pending', headers=_admin_header()).status_code == 200
+
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology').save()
+    appt = Appointment(userId=user, dermatologistId=doctor, date='2024-06-03', time='10:00').save()
+    assert client.delete(f'/api/appointments/{appt.id}', headers=_admin_header()).status_code == 200
+    assert Appointment.objects.get(id=appt.id).status == 'cancelled'
+
+
+def test_reapproving_a_rebooked_slot_conflicts(client):
+    Appointment.ensure_indexes()
+    alice = User(name='Alice', email='alice@example.com', password='x').save()
+    bob = User(name='Bob', email='bob@example.com', password='x').save()
+    doctor = Dermatologist(name='Dr. A', specialization='Dermatology').save()
+    slot = {'dermatologistId': str(doctor.id), 'date': '2024-06-03', 'time': '10:00'}
+
+    appt_id = client.post('/api/appointments/book', json=slot, headers=_auth_header(alice)).get_json()['appointment']['id']
+    status_url = f'/api/appointments/admin/status/{appt_id}'
+    assert client.put(status_url, json={'status': 'rejected'}, headers=_admin_header()).status_code == 200
+    assert client.post('/api/appointments/book', json=slot, headers=_auth_header(bob)).status_code == 201
+
+    conflict = client.put(status_url, json={'status': 'approved'}, headers=_admin_header())
+    assert conflict.status_code == 409
+    assert conflict.get_json()['message'] == 'Slot already booked'
+    assert Appointment.objects.get(id=appt_id).status == 'rejected'
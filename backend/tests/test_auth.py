@@ -0,0 +1,138 @@
+import time
+
+from flask import Flask
+
+from utils import auth
+
+
+def _app():
+    app = Flask(__name__)
+
+    @app.route('/whoami')
+    @auth.login_required
+    def whoami():
+        auth.current_claims()
+        return {'id': auth.current_user_id(), 'role': auth.current_role()}
+
+    @app.route('/admin')
+    @auth.roles_required('admin')
+    def admin():
+        return {'ok': True}
+
+    return app
+
+
+def test_token_is_decoded_once_per_request_and_cached(monkeypatch):
+    auth.token_cache.clear()
+    decodes = []
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(auth.jwt, 'decode', lambda *a, **k: decodes.append(1) or real_decode(*a, **k))
+
+    client = _app().test_client()
+    headers = {'Authorization': 'Bearer ' + auth.issue_token({'id': 'u1', 'role': 'user'})}
+    for _ in range(3):
+        assert client.get('/whoami', headers=headers).get_json() == {'id': 'u1', 'role': 'user'}
+    assert len(decodes) == 1
+    assert client.get('/admin', headers=headers).status_code == 403
+    assert client.get('/admin').status_code == 401
+
+
+def test_cached_claims_expire_with_the_token():
+    cache = auth.TokenCache(max_entries=2, ttl=60)
+    cache.put(b'a', {'id': 'a', 'exp': time.time() - 1})
+    assert cache.get(b'a') is None
+
+    cache.put(b'b', {'id': 'b'})
+    cache.put(b'c', {'id': 'c'})
+    cache.put(b'd', {'id': 'd'})
+    assert cache.get(b'b') is None and cache.get(b'd') == {'id': 'd'}
+
+
+def test_bad_tokens_are_rejected_and_not_cached():
+    auth.token_cache.clear()
+    forged = auth.jwt.encode({'id': 'x', 'role': 'admin'}, 'wrong-secret', algorithm='HS256')
+    assert auth.verify_token(forged) is None
+    assert auth.token_cache.stats()['entries'] == 0
+
+
+def test_hasher_bounds_its_queue():
+    import threading
+
+    import pytest
+    from utils.batching import QueueFullError
+    from utils.password_hashing import PasswordHasher
+
+    release = threading.Event()
+
+    class SlowBcrypt:
+        def check_password_hash(self, hashed, password):
+            release.wait(5)
+            return hashed == password
+
+    hasher = PasswordHasher(SlowBcrypt(), workers=1, max_queue=1)
+    threads = [threading.Thread(target=hasher.check, args=('a', 'a')) for _ in range(2)]
+    for t in threads:
+        t.start()
+    while hasher.stats()['inFlight'] < 2:
+        time.sleep(0.001)
+    with pytest.raises(QueueFullError):
+        hasher.check('a', 'a')
+
+    release.set()
+    for t in threads:
+        t.join()
+    stats = hasher.stats()
+    assert stats['completed'] == 2 and stats['rejected'] == 1 and stats['inFlight'] == 0
+
+
+def test_login_is_throttled_per_email(monkeypatch):
+    import pytest
+    mongomock = pytest.importorskip('mongomock')
+    import mongoengine
+    import auth_routes
+    from appointment_models import User
+    from utils.rate_limit import KeyedRateLimiter
+
+    mongoengine.disconnect()
+    mongoengine.connect('skin_app_test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    monkeypatch.setattr(auth_routes.hasher, 'rounds', 4)
+    monkeypatch.setattr(auth_routes, 'login_throttle', KeyedRateLimiter(capacity=2, per_minute=1))
+    User(name='Pat', email='pat@example.com', password=auth_routes.hasher.hash('right')).save()
+
+    app = Flask(__name__)
+    app.register_blueprint(auth_routes.auth_bp, url_prefix='/api/auth')
+    client = app.test_client()
+
+    def login(email, password):
+        return client.post('/api/auth/login', json={'email': email, 'password': password})
+
+    assert login('pat@example.com', 'wrong').status_code == 401
+    assert login('pat@example.com', 'wrong').status_code == 401
+    throttled = login('pat@example.com', 'right')
+    assert throttled.status_code == 429 and int(throttled.headers['Retry-After']) >= 1
+    # Other accounts are unaffected
+    assert login('someone@example.com', 'x').status_code == 401
+    mongoengine.disconnect()
+
+
+def test_register_ignores_a_requested_role(monkeypatch):
+    import pytest
+    mongomock = pytest.importorskip('mongomock')
+    import mongoengine
+    import auth_routes
+    from appointment_models import User
+
+    mongoengine.disconnect()
+    mongoengine.connect('skin_app_test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    monkeypatch.setattr(auth_routes.hasher, 'rounds', 4)
+    app = Flask(__name__)
+    app.register_blueprint(auth_routes.auth_bp, url_prefix='/api/auth')
+    client = app.test_client()
+
+    resp = client.post('/api/auth/register', json={'name': 'Eve', 'email': 'eve@example.com',
+                                                   'password': 'pw', 'role': 'admin'})
+    assert resp.status_code == 201
+    assert User.objects.get(email='eve@example.com').role == 'user'
+    token = client.post('/api/auth/login', json={'email': 'eve@example.com', 'password': 'pw'}).get_json()['token']
+    assert auth.verify_token(token)['role'] == 'user'
+    mongoengine.disconnect()
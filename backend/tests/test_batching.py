@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from utils.batching import MicroBatcher, QueueFullError
+
+
+def test_results_return_to_their_callers():
+    sizes = []
+
+    def double(items):
+        sizes.append(len(items))
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=50)
+    results = {}
+
+    def call(i):
+        results[i] = batcher(i, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.stop()
+
+    assert results == {i: i * 2 for i in range(20)}
+    assert max(sizes) <= 8
+    assert len(sizes) < 20
+
+
+def test_batch_errors_reach_every_caller():
+    def boom(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(boom, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher(1, timeout=5)
+    batcher.stop()
+
+
+def test_full_queue_rejects_and_reports_stats():
+    release = threading.Event()
+
+    def slow(items):
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0, max_queue=2)
+    first = batcher.submit('a')
+    # Wait for the worker to pick up 'a' so the queue itself is empty again
+    while batcher.stats()['queueDepth']:
+        pass
+    waiting = [batcher.submit('b'), batcher.submit('c')]
+    with pytest.raises(QueueFullError) as exc:
+        batcher.submit('d')
+    assert exc.value.retry_after >= 1
+
+    release.set()
+    assert [f.result(5) for f in [first] + waiting] == ['a', 'b', 'c']
+    batcher.stop()
+    stats = batcher.stats()
+    assert stats['rejected'] == 1
+    assert stats['items'] == 3
+    assert stats['maxWaitMs'] >= stats['avgWaitMs'] > 0
+
+
+def test_concurrent_submits_never_exceed_max_queue():
+    release = threading.Event()
+
+    def slow(items):
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0, max_queue=3)
+    batcher.submit('first')
+    while batcher.stats()['queueDepth']:
+        pass
+    accepted, rejected = [], []
+    start = threading.Barrier(16)
+
+    def submit(i):
+        start.wait()
+        try:
+            accepted.append(batcher.submit(i))
+        except QueueFullError:
+            rejected.append(i)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(accepted) == 3
+    assert len(rejected) == 13
+    assert batcher.stats()['rejected'] == 13
+    release.set()
+    batcher.stop()
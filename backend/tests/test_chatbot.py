@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from flask import Flask
+
+import chatbot_server
+from utils.batching import MicroBatcher
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(chatbot_server.chatbot_bp)
+    return app.test_client()
+
+
+def _events(resp):
+    return [block for block in resp.get_data(as_text=True).split('\n\n') if block]
+
+
+def test_stream_sends_tokens_then_done(client, monkeypatch):
+    closed = []
+
+    def fake_stream(question, max_new_tokens):
+        try:
+            yield 'Melanoma '
+            yield 'is a skin cancer.'
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(chatbot_server, 'stream_answer', fake_stream)
+    resp = client.post('/chatbot/stream', json={'question': 'what is melanoma'})
+
+    assert resp.mimetype == 'text/event-stream'
+    events = _events(resp)
+    tokens = [json.loads(e[len('data: '):])['token'] for e in events if e.startswith('data: ')]
+    assert ''.join(tokens) == 'Melanoma is a skin cancer.'
+    assert events[-1].startswith('event: done')
+    assert closed == [True]
+
+
+def test_stream_out_of_scope_needs_no_model(client):
+    resp = client.post('/chatbot/stream', json={'question': 'best pizza in town?'})
+    data = json.loads(_events(resp)[0][len('data: '):])
+    assert data['token'] == chatbot_server.OUT_OF_SCOPE_ANSWER
+
+
+def test_full_generation_queue_returns_429(client, monkeypatch):
+    def busy(question):
+        raise chatbot_server.QueueFullError('chatbot-batcher queue is full', retry_after=3)
+
+    monkeypatch.setattr(chatbot_server, 'ask_bot', busy)
+    resp = client.post('/chatbot', json={'question': 'is this rash serious'})
+    assert resp.status_code == 429
+    assert resp.headers['Retry-After'] == '3'
+
+
+def test_stream_slots_are_released(client, monkeypatch):
+    monkeypatch.setattr(chatbot_server, 'stream_slots', chatbot_server.threading.BoundedSemaphore(1))
+    monkeypatch.setattr(chatbot_server, 'stream_answer', lambda q, n: (piece for piece in ['ok']))
+
+    for _ in range(3):
+        resp = client.post('/chatbot/stream', json={'question': 'skin care'})
+        assert resp.status_code == 200
+        resp.get_data()
+        resp.close()
+
+    assert chatbot_server.stream_slots.acquire(blocking=False)
+    held = client.post('/chatbot/stream', json={'question': 'skin care'})
+    assert held.status_code == 429
+
+
+def test_repeated_question_is_served_from_cache(client, monkeypatch):
+    calls = []
+
+    def generate(questions):
+        calls.extend(questions)
+        return ['generated answer'] * len(questions)
+
+    monkeypatch.setattr(chatbot_server, 'generation_batcher', MicroBatcher(generate, max_wait_ms=0))
+    monkeypatch.setattr(chatbot_server, 'curated_answers', None)
+    monkeypatch.setattr(chatbot_server, 'answer_cache', chatbot_server.AnswerCache(8, 60))
+
+    for question in ['Why does my scar itch?', 'why does my scar itch']:
+        resp = client.post('/chatbot', json={'question': question})
+        assert resp.get_json() == {'answer': 'generated answer'}
+
+    assert len(calls) == 1
+    stats = client.get('/chatbot/stats').get_json()
+    assert stats['answerCache']['hits'] == 1
+
+
+def test_unknown_chat_quantization_is_rejected_before_loading():
+    from utils.chat_models import load_chat_model
+
+    with pytest.raises(ValueError):
+        load_chat_model('microsoft/biogpt', quantize='int4')
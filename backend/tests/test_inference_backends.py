@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from utils.inference_backends import resolve_backend, exported_path, load_backend
+
+
+def test_unknown_backend_falls_back_to_keras():
+    assert resolve_backend('ONNX') == 'onnx'
+    assert resolve_backend('tf-lite') == 'keras'
+    assert resolve_backend('') == 'keras'
+    # The fallback keeps exported_path() (used at import by app.py) from raising
+    assert exported_path('ai_models/m.keras', resolve_backend('tf-lite')) == 'ai_models/m.keras'
+
+
+def _tiny_classifier(path, classes=7):
+    """NHWC float32 image -> flatten -> MatMul -> Softmax; returns the weights for a numpy reference."""
+    onnx = pytest.importorskip('onnx')
+    from onnx import helper, numpy_helper, TensorProto
+
+    weights = np.random.default_rng(0).normal(size=(8 * 8 * 3, classes)).astype(np.float32) * 0.01
+    graph = helper.make_graph(
+        [helper.make_node('Flatten', ['image'], ['flat'], axis=1),
+         helper.make_node('MatMul', ['flat', 'weights'], ['logits']),
+         helper.make_node('Softmax', ['logits'], ['probs'], axis=-1)],
+        'tiny_classifier',
+        [helper.make_tensor_value_info('image', TensorProto.FLOAT, ['N', 8, 8, 3])],
+        [helper.make_tensor_value_info('probs', TensorProto.FLOAT, ['N', classes])],
+        [numpy_helper.from_array(weights, 'weights')])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return weights
+
+
+def test_onnx_backend_predicts_like_keras(tmp_path):
+    pytest.importorskip('onnxruntime')
+    path = tmp_path / 'm.onnx'
+    weights = _tiny_classifier(path)
+    batch = np.random.default_rng(1).random((3, 8, 8, 3)) * 255
+
+    out = load_backend('onnx', str(path), num_threads=1).predict(batch, verbose=0)
+
+    logits = batch.reshape(3, -1).astype(np.float32) @ weights
+    expected = np.exp(logits - logits.max(axis=1, keepdims=True))
+    expected /= expected.sum(axis=1, keepdims=True)
+    assert out.shape == (3, 7)
+    assert out.dtype == np.float32
+    assert np.allclose(out, expected, atol=1e-5)
+
+
+def test_missing_export_leaves_analyze_without_a_model(tmp_path, monkeypatch):
+    pytest.importorskip('onnxruntime')
+    import app
+    from utils.prediction_cache import PredictionCache
+
+    monkeypatch.setattr(app, 'INFERENCE_BACKEND', 'onnx')
+    monkeypatch.setattr(app, 'INFERENCE_MODEL_PATH', None)
+    monkeypatch.setattr(app, 'MODEL_PATH', str(tmp_path / 'm.keras'))
+    monkeypatch.setattr(app, 'prediction_cache', PredictionCache(str(tmp_path / 'm.onnx')))
+    model_id = app.prediction_cache.model_id
+
+    # export_model.py has not been run: no model, and the cache keeps its key
+    assert app.load_melanoma_model() is None
+    assert app.prediction_cache.model_id == model_id
+
+    _tiny_classifier(tmp_path / 'm.onnx')
+    model = app.load_melanoma_model()
+    assert model.predict(np.zeros((2, 8, 8, 3)), verbose=0).shape == (2, 7)
+    assert app.prediction_cache.model_id != model_id
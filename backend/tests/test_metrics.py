@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from flask import Flask, Blueprint
+
+from utils import metrics
+from utils.metrics import Histogram, stage
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram('demo_seconds', 'Demo.', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        hist.observe(value, '/a')
+
+    lines = hist.render()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/a"} 4' in lines
+    assert hist.snapshot()[('/a',)] == (4, 4.25)
+
+
+def test_requests_stages_and_mongo_queries_are_exposed():
+    bp = Blueprint('metrics_test_bp', __name__)
+
+    @bp.route('/items/<item_id>')
+    def item(item_id):
+        with stage('metrics_test', 'load'):
+            # What pymongo does for each command while the request runs
+            metrics.mongo_queries.started(SimpleNamespace(command_name='find'))
+            metrics.mongo_queries.started(SimpleNamespace(command_name='find'))
+        return {'id': item_id}
+
+    app = Flask(__name__)
+    app.register_blueprint(bp, url_prefix='/api')
+    metrics.init_app(app)
+    client = app.test_client()
+
+    assert client.get('/api/items/1').status_code == 200
+    assert client.get('/api/items/2').status_code == 200
+    assert client.get('/api/missing').status_code == 404
+
+    resp = client.get('/metrics')
+    assert resp.status_code == 200
+    assert resp.content_type.startswith('text/plain; version=0.0.4')
+    text = resp.get_data(as_text=True)
+    # One series per URL rule, not per concrete path
+    assert 'http_request_duration_seconds_count{endpoint="/api/items/<item_id>",method="GET",status="200"} 2' in text
+    assert 'http_request_duration_seconds_count{endpoint="<unmatched>",method="GET",status="404"} 1' in text
+    assert 'pipeline_stage_duration_seconds_count{pipeline="metrics_test",stage="load"} 2' in text
+    assert 'mongo_queries_per_request_sum{endpoint="/api/items/<item_id>"} 4' in text
+    assert 'mongo_queries_per_request_bucket{endpoint="/api/items/<item_id>",le="2"} 2' in text
+    assert metrics.MONGO_COMMANDS.value('find') >= 4
+
+
+def test_broken_gauge_does_not_break_the_scrape():
+    registry = metrics.MetricsRegistry()
+    registry.gauge('ok_depth', 'Fine.', lambda: 3)
+    registry.gauge('broken_depth', 'Raises.', lambda: 1 / 0)
+
+    text = registry.render()
+    assert 'ok_depth 3' in text
+    assert 'broken_depth' not in text
+
+
+def test_answer_cache_and_curated_stats_are_exposed(monkeypatch):
+    import chatbot_server
+    from utils.answer_cache import AnswerCache
+
+    cache = AnswerCache(8, 60)
+    monkeypatch.setattr(chatbot_server, 'answer_cache', cache)
+    cache.put('what is a mole', 'A mole is ...', 2.0)
+    cache.get('what is a mole')
+    cache.get('what is a scar')
+
+    text = metrics.metrics.render()
+    assert 'chatbot_answer_cache_hits 1' in text
+    assert 'chatbot_answer_cache_misses 1' in text
+    assert 'chatbot_answer_cache_hit_ratio 0.5' in text
+    assert 'chatbot_answer_cache_time_saved_seconds 2.0' in text
+    for source in ('answer_cache', 'curated'):
+        for suffix in ('hits', 'misses', 'hit_ratio', 'time_saved_seconds'):
+            assert f'# TYPE chatbot_{source}_{suffix} gauge' in text
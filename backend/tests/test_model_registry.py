@@ -0,0 +1,32 @@
+import threading
+
+from utils.model_registry import ModelRegistry
+
+
+def test_loader_runs_once_on_first_use():
+    calls = []
+    registry = ModelRegistry()
+    registry.register('m', lambda: calls.append(1) or 'model')
+    assert registry.status()['m']['state'] == ModelRegistry.NOT_LOADED
+
+    threads = [threading.Thread(target=registry.get, args=('m',)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert registry.get('m') == 'model'
+    assert len(calls) == 1
+    assert registry.is_ready('m')
+
+
+def test_missing_and_failing_models_are_reported():
+    registry = ModelRegistry()
+    registry.register('missing', lambda: None)
+    registry.register('broken', lambda: 1 / 0)
+    registry.warm_async().join()
+
+    status = registry.status()
+    assert status['missing']['state'] == ModelRegistry.UNAVAILABLE
+    assert status['broken']['state'] == ModelRegistry.FAILED
+    assert registry.get('broken') is None
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+
+from utils.prediction_cache import PredictionCache, model_identity
+
+
+def _model_file(tmp_path):
+    path = tmp_path / 'model.keras'
+    path.write_bytes(b'v1')
+    return str(path)
+
+
+def test_lru_eviction_and_counters(tmp_path):
+    cache = PredictionCache(_model_file(tmp_path), max_entries=2)
+    cache.put('a', [0.1, 0.9])
+    cache.put('b', [0.2, 0.8])
+    assert cache.get('a') is not None  # 'a' becomes most recent
+    cache.put('c', [0.3, 0.7])         # evicts 'b'
+
+    assert cache.get('b') is None
+    assert np.allclose(cache.get('c'), [0.3, 0.7])
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 2)
+
+
+def test_only_loading_a_new_model_invalidates(tmp_path):
+    model_path = _model_file(tmp_path)
+    cache = PredictionCache(model_path, max_entries=8)
+    cache.put('a', [1.0])
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    # The old model is still the one in memory, so its outputs stay valid
+    assert cache.get('a') is not None
+    cache.set_model(model_identity(model_path))
+    assert cache.get('a') is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_persistent_layer_survives_restart(tmp_path):
+    model_path = _model_file(tmp_path)
+    db_path = str(tmp_path / 'cache.db')
+    PredictionCache(model_path, max_entries=8, db_path=db_path).put('a', [0.25, 0.75])
+
+    reopened = PredictionCache(model_path, max_entries=8, db_path=db_path)
+    assert np.allclose(reopened.get('a'), [0.25, 0.75])
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pytest
+
+from utils.preprocessing import preprocess_melanoma_bytes, preprocess_melanoma_image
+
+UPLOADS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads')
+
+
+def _sample_path():
+    names = sorted(n for n in os.listdir(UPLOADS) if n.lower().endswith('.jpg'))
+    if not names:
+        pytest.skip("no sample uploads available")
+    return os.path.join(UPLOADS, names[0])
+
+
+def test_bytes_match_path_pipeline():
+    path = _sample_path()
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    from_path = preprocess_melanoma_image(path)
+    assert from_path.shape == (224, 224, 3)
+    assert np.array_equal(preprocess_melanoma_bytes(data), from_path)
+    assert np.array_equal(preprocess_melanoma_bytes(np.frombuffer(data, np.uint8)), from_path)
+
+
+def test_invalid_bytes_raise():
+    with pytest.raises(ValueError):
+        preprocess_melanoma_bytes(b'not an image')
+    with pytest.raises(ValueError):
+        preprocess_melanoma_bytes(b'')
+
+
+def test_process_pool_matches_inline():
+    from utils.preprocess_pool import PreprocessPool
+
+    path = _sample_path()
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    with PreprocessPool(workers=1, slots=2) as pool:
+        assert np.array_equal(pool.preprocess(data), preprocess_melanoma_bytes(data))
+        results = dict(pool.map([path, b'broken', data]))
+
+    assert np.array_equal(results[0], results[2])
+    assert isinstance(results[1], ValueError)
+
+
+def test_pool_created_after_threads_are_running():
+    import threading
+    from utils.preprocess_pool import PreprocessPool
+
+    with open(_sample_path(), 'rb') as f:
+        data = f.read()
+
+    # Like a web worker: another thread holds a lock while the pool starts its workers
+    lock = threading.Lock()
+    held, release = threading.Event(), threading.Event()
+
+    def hold():
+        with lock:
+            held.set()
+            release.wait(10)
+
+    thread = threading.Thread(target=hold, daemon=True)
+    thread.start()
+    held.wait(5)
+    try:
+        with PreprocessPool(workers=1, slots=1) as pool:
+            assert np.array_equal(pool.preprocess(data, timeout=60), preprocess_melanoma_bytes(data))
+    finally:
+        release.set()
+        thread.join(5)
+
+
+def test_timed_out_slot_is_freed_only_when_the_job_ends():
+    import queue
+    from utils.preprocess_pool import PreprocessPool
+
+    with open(_sample_path(), 'rb') as f:
+        data = f.read()
+
+    with PreprocessPool(workers=1, slots=1) as pool:
+        # The first job also waits for the worker process to start, so it cannot finish in time
+        with pytest.raises(TimeoutError):
+            pool.preprocess(data, timeout=0.0001)
+        with pytest.raises(queue.Empty):
+            pool._free.get_nowait()
+        # Back once the worker has finished writing into it
+        pool._free.put(pool._free.get(timeout=10))
+        assert np.array_equal(pool.preprocess(data), preprocess_melanoma_bytes(data))
+
+
+def test_batch_preprocess_reports_corrupt_files(tmp_path):
+    from utils.batch_preprocess import preprocess_to_npy
+
+    path = _sample_path()
+    with open(path, 'rb') as f:
+        data = f.read()
+    (tmp_path / 'a.jpg').write_bytes(data)
+    (tmp_path / 'b.jpg').write_bytes(b'corrupt')
+    (tmp_path / 'c.jpg').write_bytes(data)
+    out = str(tmp_path / 'out.npy')
+
+    names, errors = preprocess_to_npy(str(tmp_path), out, chunk_size=2)
+
+    images = np.load(out)
+    assert names == ['a.jpg', 'c.jpg']
+    assert [name for name, _ in errors] == ['b.jpg']
+    assert images.shape == (2, 224, 224, 3)
+    assert np.array_equal(images[0], preprocess_melanoma_bytes(data))
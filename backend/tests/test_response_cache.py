@@ -0,0 +1,25 @@
+from utils.response_cache import InProcessBackend, ResponseCache
+
+
+def test_build_racing_an_invalidation_is_not_stored():
+    cache = ResponseCache(InProcessBackend(), ttl=300)
+    versions = iter([b'["old"]', b'["new"]'])
+
+    def build_and_get_invalidated():
+        body = next(versions)
+        # A post_save signal fires while the old list is being serialized
+        cache.invalidate('doctors')
+        return body
+
+    body, etag = cache.get_or_build('doctors', build_and_get_invalidated)
+    assert body == b'["old"]'
+    assert cache.get_or_build('doctors', lambda: next(versions)) == (b'["new"]', ResponseCache.make_etag(b'["new"]'))
+
+
+def test_hits_reuse_the_stored_etag(monkeypatch):
+    cache = ResponseCache(InProcessBackend(), ttl=300)
+    body, etag = cache.get_or_build('k', lambda: b'[1, 2]')
+
+    monkeypatch.setattr(ResponseCache, 'make_etag', staticmethod(lambda body: 1 / 0))
+    assert cache.get_or_build('k', lambda: b'unused') == (body, etag)
+    assert (cache.hits, cache.misses) == (1, 1)
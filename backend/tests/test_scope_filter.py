@@ -0,0 +1,35 @@
+import os
+
+from utils.scope_filter import ScopeFilter, compile_vocabulary
+
+
+def test_whole_words_prefixes_and_phrases():
+    pattern = compile_vocabulary(['burn', 'melanom*', 'basal cell', 'grain de beauté'])
+
+    def found(text):
+        return bool(pattern.search(text.casefold()))
+
+    assert found('How do I treat a burn?')
+    assert not found('heartburn after dinner')
+    assert found('Melanomas spread') and found('melanoma')
+    assert found('basal   cell carcinoma')
+    assert found('Mon grain de beauté change')
+    assert not found('best pizza in town')
+
+
+def test_missing_file_uses_fallback_terms(tmp_path):
+    scope = ScopeFilter(str(tmp_path / 'missing.txt'), fallback=['skin*'])
+    assert scope('my skincare routine')
+    assert scope.stats()['path'] is None
+
+
+def test_vocabulary_file_is_hot_reloaded(tmp_path):
+    path = tmp_path / 'vocab.txt'
+    path.write_text('# comment\nmole\n', encoding='utf-8')
+    scope = ScopeFilter(str(path), check_interval=0)
+    assert scope('is this mole cancer') and not scope('what is vitiligo')
+
+    path.write_text('mole\nvitiligo\n', encoding='utf-8')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert scope('what is vitiligo')
+    assert scope.stats() == {'path': str(path), 'terms': 2, 'reloads': 2}
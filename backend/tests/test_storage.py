@@ -0,0 +1,27 @@
+import threading
+
+from utils import storage
+
+
+def test_concurrent_saves_of_one_name_do_not_collide(tmp_path):
+    path = str(tmp_path / 'lesion.jpg')
+    payloads = [bytes([i]) * 2000000 for i in range(8)]
+    errors = []
+
+    def write(data):
+        try:
+            for _ in range(5):
+                storage._write_bytes(path, data)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(data,)) for data in payloads]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # One complete payload wins; no failed replace, no mixed file, no temp files left behind
+    assert errors == []
+    assert (tmp_path / 'lesion.jpg').read_bytes() in payloads
+    assert [p.name for p in tmp_path.iterdir()] == ['lesion.jpg']
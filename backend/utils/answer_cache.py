@@ -0,0 +1,207 @@
+import os
+import re
+import difflib
+import json
+import time
+import threading
+from collections import OrderedDict, defaultdict
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_question(question):
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key."""
+    return _NON_WORD.sub(" ", question.lower()).strip()
+
+
+class AnswerCache:
+    """
+    LRU cache of generated chatbot answers keyed by the normalized question.
+
+    max_entries: size bound (0 disables caching)
+    ttl: seconds an answer is served before it is generated again (0 = forever)
+    """
+
+    def __init__(self, max_entries=512, ttl=3600):
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.time_saved = 0.0
+        self._generations = 0
+        self._generation_time = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, question):
+        """Return the cached answer for question, or None."""
+        if not self.enabled:
+            return None
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[2] < time.monotonic():
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # A hit skips a generation that took this long the first time
+            self.time_saved += entry[1]
+            return entry[0]
+
+    def put(self, question, answer, seconds):
+        """seconds: how long generating answer took, credited on every later hit."""
+        with self._lock:
+            self._generations += 1
+            self._generation_time += seconds
+            if not self.enabled:
+                return
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            key = normalize_question(question)
+            self._entries[key] = (answer, seconds, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def avg_generation_seconds(self):
+        with self._lock:
+            return self._generation_time / self._generations if self._generations else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'timeSavedSeconds': round(self.time_saved, 3)
+            }
+
+
+# Words that only frame a question; everything else is content that must match
+_FRAMING_WORDS = frozenset("""
+    a an the i me my am is are was be do does did can could should would will how what why when where which
+    who to of for about this that it there any if
+""".split())
+
+
+def _stem(token):
+    # Plural/third-person 's' only ("scars" -> "scar"), enough for short questions
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def content_tokens(question):
+    """Set of the question's content words (framing words dropped, plurals folded)."""
+    return {_stem(token) for token in normalize_question(question).split() if token not in _FRAMING_WORDS}
+
+
+class CuratedAnswers:
+    """
+    Hand-written answers for frequent questions, matched on content words.
+
+    A curated phrasing matches only when every content word of the query
+    appears in it (after fixing small typos against the curated vocabulary)
+    and the two word sets overlap by at least threshold (Jaccard). A query
+    with an extra qualifier ("burn scar", "chemical burn", "clean a burn")
+    therefore never borrows the answer of the plainer question; it goes to
+    the model instead.
+
+    entries: [{"question": ..., "answer": ...}, ...]; one answer may list
+             several phrasings under "questions" instead
+    """
+
+    # difflib ratio a word needs to be read as a typo of a curated word
+    TYPO_CUTOFF = 0.85
+
+    def __init__(self, entries, threshold=0.8):
+        self.threshold = float(threshold)
+        self.hits = 0
+        self.misses = 0
+        self._answers = []
+        self._tokens = []
+        self._index = defaultdict(list)
+        self._lock = threading.Lock()
+        for entry in entries:
+            phrasings = entry.get('questions') or [entry['question']]
+            for question in phrasings:
+                tokens = content_tokens(question)
+                row = len(self._answers)
+                self._answers.append(entry['answer'])
+                self._tokens.append(tokens)
+                for token in tokens:
+                    self._index[token].append(row)
+        self._vocabulary = sorted(self._index)
+
+    @classmethod
+    def from_file(cls, path, threshold=0.8):
+        """Load a JSON list of entries; returns None when path does not exist."""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), threshold)
+
+    def __len__(self):
+        return len(self._answers)
+
+    def _correct(self, token):
+        if token in self._index:
+            return token
+        close = difflib.get_close_matches(token, self._vocabulary, n=1, cutoff=self.TYPO_CUTOFF)
+        return close[0] if close else token
+
+    def match(self, question):
+        """returns: (answer, score) for the closest curated question, or (None, best score)"""
+        tokens = {self._correct(token) for token in content_tokens(question)}
+        candidates = set()
+        for token in tokens:
+            candidates.update(self._index.get(token, ()))
+        best_row, best_score = None, 0.0
+        for row in candidates:
+            row_tokens = self._tokens[row]
+            score = len(tokens & row_tokens) / len(tokens | row_tokens)
+            # Extra words in the query (a qualifier the curated question lacks) rule the row out
+            if tokens <= row_tokens and score > best_score:
+                best_row, best_score = row, score
+        if best_row is not None and best_score >= self.threshold:
+            return self._answers[best_row], best_score
+        return None, best_score
+
+    def lookup(self, question):
+        answer, _ = self.match(question)
+        with self._lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._answers),
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
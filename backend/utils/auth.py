@@ -0,0 +1,148 @@
+import os
+import time
+import hashlib
+import threading
+from functools import wraps
+from collections import OrderedDict
+
+import jwt
+from flask import g, request, jsonify
+
+# Shared by token issuing (auth_routes) and every route that checks tokens
+JWT_SECRET = os.getenv('JWT_SECRET', 'supersecretkey123')
+JWT_ALGORITHMS = ['HS256']
+
+AUTH_CACHE_SIZE = int(os.getenv('AUTH_CACHE_SIZE', '4096'))
+AUTH_CACHE_TTL = float(os.getenv('AUTH_CACHE_TTL', '60'))
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified token claims, keyed by the token's SHA-256.
+
+    An entry lives for at most ttl seconds and never past the token's own
+    'exp', so a cached token expires exactly when a fresh decode would
+    reject it. Only successfully verified tokens are stored.
+    """
+
+    def __init__(self, max_entries=4096, ttl=60):
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, claims):
+        if self.max_entries <= 0:
+            return
+        expires = time.time() + self.ttl
+        if isinstance(claims.get('exp'), (int, float)):
+            expires = min(expires, claims['exp'])
+        with self._lock:
+            self._entries[key] = (claims, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+token_cache = TokenCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+
+
+def issue_token(claims):
+    return jwt.encode(claims, JWT_SECRET, algorithm=JWT_ALGORITHMS[0])
+
+
+def verify_token(token):
+    """Claims of a valid token (from the cache when possible), or None."""
+    key = token_cache.key(token)
+    claims = token_cache.get(key)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=JWT_ALGORITHMS)
+    except jwt.InvalidTokenError:
+        return None
+    token_cache.put(key, claims)
+    return claims
+
+
+def bearer_token():
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip() or None
+    return None
+
+
+def current_claims():
+    """Verified claims for this request's bearer token, or None. Decoded once per request."""
+    if 'auth_claims' not in g:
+        token = bearer_token()
+        g.auth_claims = verify_token(token) if token else None
+    return g.auth_claims
+
+
+def current_user_id():
+    claims = current_claims()
+    return claims.get('id') if claims else None
+
+
+def current_role():
+    claims = current_claims()
+    return claims.get('role') if claims else None
+
+
+def login_required(view):
+    """401 unless the request carries a valid token."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_claims() is None:
+            return jsonify({'success': False, 'message': 'Authentication required'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def roles_required(*roles):
+    """401 without a valid token, 403 unless its role is one of roles."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            claims = current_claims()
+            if claims is None:
+                return jsonify({'success': False, 'message': 'Authentication required'}), 401
+            if claims.get('role') not in roles:
+                return jsonify({'success': False, 'message': 'Insufficient permissions'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
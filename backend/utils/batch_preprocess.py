@@ -0,0 +1,202 @@
+"""
+Batch preprocessing for directories, glob patterns and zip archives.
+
+Images are streamed in fixed-size chunks, so memory stays bounded by the
+chunk size no matter how large the dataset is. Unreadable files are
+reported per item instead of aborting the run.
+
+CLI (from backend/):
+    python -m utils.batch_preprocess uploads -o uploads.npy
+    python -m utils.batch_preprocess "data/**/*.jpg" -o eval.npy --workers 4
+    python -m utils.batch_preprocess archive.zip -o archive.npy
+"""
+import os
+import sys
+import glob
+import json
+import time
+import zipfile
+import argparse
+
+import numpy as np
+
+from utils.preprocessing import preprocess_melanoma_bytes, preprocess_melanoma_image
+
+IMAGE_SHAPE = (224, 224, 3)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def _is_image(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def list_image_sources(source):
+    """
+    source: directory, glob pattern or .zip archive
+    returns: list of (name, item) where item is a file path or a
+             (zip_path, member) pair, in a stable sorted order
+    """
+    if os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source) if _is_image(n))
+        return [(n, os.path.join(source, n)) for n in names]
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            members = sorted(m for m in zf.namelist() if _is_image(m) and not m.endswith('/'))
+        return [(m, (source, m)) for m in members]
+    paths = sorted(p for p in glob.glob(source, recursive=True) if _is_image(p) and os.path.isfile(p))
+    return [(p, p) for p in paths]
+
+
+def _load_items(items, archives):
+    """Turn zip members into bytes; leave plain paths alone. Failures become exceptions."""
+    loaded = []
+    for item in items:
+        if isinstance(item, tuple):
+            zip_path, member = item
+            try:
+                if zip_path not in archives:
+                    archives[zip_path] = zipfile.ZipFile(zip_path)
+                loaded.append(archives[zip_path].read(member))
+            except (OSError, zipfile.BadZipFile, KeyError) as e:
+                loaded.append(e)
+        else:
+            loaded.append(item)
+    return loaded
+
+
+def _preprocess_one(item):
+    if isinstance(item, str):
+        return preprocess_melanoma_image(item)
+    return preprocess_melanoma_bytes(item)
+
+
+def iter_preprocessed_chunks(sources, chunk_size=64, pool=None):
+    """
+    sources: list from list_image_sources()
+    pool: optional PreprocessPool to spread each chunk over worker processes
+    yields: (names, images, errors) per chunk, where images is a contiguous
+            (n, 224, 224, 3) uint8 array of the successful items in order and
+            errors is a list of (name, message). images is a view into a
+            buffer reused by the next chunk; copy it to keep it.
+    """
+    buffer = np.empty((chunk_size,) + IMAGE_SHAPE, dtype=np.uint8)
+    archives = {}
+    try:
+        for start in range(0, len(sources), chunk_size):
+            chunk = sources[start:start + chunk_size]
+            names, errors = [], []
+            items = _load_items([item for _, item in chunk], archives)
+            results = {i: item for i, item in enumerate(items) if isinstance(item, Exception)}
+            todo = [i for i, item in enumerate(items) if not isinstance(item, Exception)]
+
+            if pool is not None:
+                for j, result in pool.map([items[i] for i in todo]):
+                    results[todo[j]] = result
+            else:
+                for i in todo:
+                    try:
+                        results[i] = _preprocess_one(items[i])
+                    except Exception as e:
+                        results[i] = e
+
+            count = 0
+            for i, (name, _) in enumerate(chunk):
+                result = results[i]
+                if isinstance(result, Exception):
+                    errors.append((name, str(result)))
+                    continue
+                buffer[count] = result
+                names.append(name)
+                count += 1
+            yield names, buffer[:count], errors
+    finally:
+        for zf in archives.values():
+            zf.close()
+
+
+def preprocess_to_array(source, chunk_size=64, pool=None):
+    """
+    Preprocess every image in source into one (N, 224, 224, 3) uint8 array.
+    returns: (images, names, errors)
+    """
+    sources = list_image_sources(source)
+    images = np.empty((len(sources),) + IMAGE_SHAPE, dtype=np.uint8)
+    names, errors = [], []
+    for chunk_names, chunk, chunk_errors in iter_preprocessed_chunks(sources, chunk_size, pool):
+        images[len(names):len(names) + len(chunk)] = chunk
+        names.extend(chunk_names)
+        errors.extend(chunk_errors)
+    return images[:len(names)], names, errors
+
+
+def _shrink_npy(path, rows):
+    """Rewrite the .npy header in place for fewer rows and drop the unused tail."""
+    with open(path, 'r+b') as f:
+        np.lib.format.read_magic(f)
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        data_offset = f.tell()
+        header = repr({'descr': np.lib.format.dtype_to_descr(dtype),
+                       'fortran_order': fortran_order,
+                       'shape': (rows,) + tuple(shape[1:])})
+        # Same header length as before (fewer digits only ever shrink it)
+        header_len = data_offset - 10
+        f.seek(10)
+        f.write(header.ljust(header_len - 1).encode('latin1') + b'\n')
+        f.truncate(data_offset + rows * int(np.prod(shape[1:])) * dtype.itemsize)
+
+
+def preprocess_to_npy(source, out_path, chunk_size=64, pool=None):
+    """
+    Stream every image in source into a memory-mapped .npy file. Only one
+    chunk is held in memory at a time. Names of the stored rows and any
+    per-item errors are written next to it as <out_path>.json.
+    returns: (names, errors)
+    """
+    sources = list_image_sources(source)
+    out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.uint8,
+                                    shape=(len(sources),) + IMAGE_SHAPE)
+    names, errors = [], []
+    for chunk_names, chunk, chunk_errors in iter_preprocessed_chunks(sources, chunk_size, pool):
+        out[len(names):len(names) + len(chunk)] = chunk
+        names.extend(chunk_names)
+        errors.extend(chunk_errors)
+    out.flush()
+    del out
+    if len(names) < len(sources):
+        _shrink_npy(out_path, len(names))
+
+    with open(out_path + '.json', 'w') as f:
+        json.dump({'names': names, 'errors': [{'name': n, 'error': e} for n, e in errors]}, f, indent=2)
+    return names, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help='directory, glob pattern or .zip archive')
+    parser.add_argument('-o', '--output', required=True, help='output .npy file')
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=0, help='preprocessing processes (0 = inline)')
+    args = parser.parse_args(argv)
+
+    pool = None
+    if args.workers > 0:
+        from utils.preprocess_pool import PreprocessPool
+        pool = PreprocessPool(args.workers)
+
+    start = time.perf_counter()
+    try:
+        names, errors = preprocess_to_npy(args.source, args.output, args.chunk_size, pool)
+    finally:
+        if pool is not None:
+            pool.close()
+    elapsed = time.perf_counter() - start
+
+    for name, error in errors:
+        print(f"[ERROR] {name}: {error}", file=sys.stderr)
+    print(f"Wrote {len(names)} images to {args.output} "
+          f"({len(errors)} failed, {len(names) / max(elapsed, 1e-9):.1f} img/s)")
+    return 1 if errors and not names else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
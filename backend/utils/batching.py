@@ -0,0 +1,156 @@
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class QueueFullError(Exception):
+    """Raised by MicroBatcher.submit when the bounded queue has no room."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and runs them through
+    batch_fn in groups.
+
+    batch_fn: callable taking a list of items and returning one result per item
+    max_batch_size: largest batch handed to batch_fn
+    max_wait_ms: how long the first item in a batch waits for company
+    max_queue: items allowed to wait at once (0 = unbounded); beyond that
+               submit() raises QueueFullError so callers can shed load
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=20, name="micro-batcher", max_queue=0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self.max_queue = max(0, int(max_queue))
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = False
+        # Counters for stats(); updated by the worker thread
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._batch_time_total = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        with self._lock:
+            thread = self._thread
+            self._stopped = True
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result."""
+        if self._stopped:
+            raise RuntimeError(f"{self.name} is stopped")
+        if self._thread is None:
+            self.start()
+        future = Future()
+        # Check and enqueue under one lock so concurrent submits cannot overshoot max_queue
+        # (the worker only ever takes items out)
+        with self._stats_lock:
+            full = self.max_queue and self._queue.qsize() >= self.max_queue
+            if full:
+                self._rejected += 1
+            else:
+                self._queue.put((item, future, time.monotonic()))
+        if full:
+            # estimated_wait() takes _stats_lock itself
+            raise QueueFullError(f"{self.name} queue is full", self.estimated_wait())
+        return future
+
+    def __call__(self, item, timeout=None):
+        """Blocking helper: submit one item and wait for its result."""
+        return self.submit(item).result(timeout)
+
+    def estimated_wait(self):
+        """Rough seconds until a newly queued item would be served (at least 1)."""
+        with self._stats_lock:
+            per_batch = self._batch_time_total / self._batches if self._batches else 1.0
+        batches_ahead = self._queue.qsize() / self.max_batch_size + 1
+        return max(1, math.ceil(batches_ahead * per_batch))
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queueDepth': self._queue.qsize(),
+                'maxQueue': self.max_queue,
+                'maxBatchSize': self.max_batch_size,
+                'batches': self._batches,
+                'items': self._items,
+                'rejected': self._rejected,
+                'avgBatchSize': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'avgWaitMs': round(self._wait_total / self._items * 1000, 2) if self._items else 0.0,
+                'maxWaitMs': round(self._wait_max * 1000, 2),
+                'avgBatchMs': round(self._batch_time_total / self._batches * 1000, 2) if self._batches else 0.0
+            }
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Put the sentinel back so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+            # Skip requests whose caller already gave up
+            batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.monotonic()
+            waits = [started - submitted for _, _, submitted in batch]
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+                for (_, fut, _), res in zip(batch, results):
+                    fut.set_result(res)
+            except Exception as e:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            finally:
+                with self._stats_lock:
+                    self._batches += 1
+                    self._items += len(batch)
+                    self._wait_total += sum(waits)
+                    self._wait_max = max(self._wait_max, max(waits))
+                    self._batch_time_total += time.monotonic() - started
@@ -0,0 +1,86 @@
+import os
+import json
+
+# Weight formats a chat model can be loaded in. 'int8' applies PyTorch
+# dynamic quantization to every Linear layer after loading (weights stored
+# as int8, activations quantized on the fly), which is CPU-only and needs no
+# calibration data; 'bfloat16' halves memory with no extra tooling.
+CHAT_QUANTIZATIONS = ('int8', 'bfloat16')
+
+
+def is_local_checkpoint(model):
+    return os.path.isdir(model)
+
+
+def load_chat_model(model, quantize=None, offline=False, num_threads=None):
+    """
+    model: Hugging Face model id or a local checkpoint directory
+           (anything AutoModelForCausalLM can load, e.g. a distilled BioGPT)
+    quantize: None, 'int8' or 'bfloat16'
+    offline: never touch the network; the files must already be local
+    returns: transformers text-generation pipeline ready for batched prompts
+    """
+    if quantize and quantize not in CHAT_QUANTIZATIONS:
+        raise ValueError(f"Unknown chat quantization '{quantize}' (expected one of {', '.join(CHAT_QUANTIZATIONS)})")
+
+    # transformers/torch are heavy imports, so they happen on first use only
+    import torch
+    from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    local_only = offline or is_local_checkpoint(model)
+    kwargs = {'local_files_only': local_only, 'low_cpu_mem_usage': True}
+    if quantize == 'bfloat16':
+        kwargs['torch_dtype'] = torch.bfloat16
+
+    tokenizer = AutoTokenizer.from_pretrained(model, local_files_only=local_only)
+    lm = AutoModelForCausalLM.from_pretrained(model, **kwargs)
+    lm.eval()
+    if quantize == 'int8':
+        lm = torch.ao.quantization.quantize_dynamic(lm, {torch.nn.Linear}, dtype=torch.qint8)
+
+    # Batched prompts are padded on the left so generation continues each one
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    return pipeline("text-generation", model=lm, tokenizer=tokenizer, device=-1)
+
+
+def save_local_checkpoint(model, out_dir, bfloat16=False):
+    """Download model (once) and save model + tokenizer to out_dir for offline startup."""
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
+    kwargs = {'low_cpu_mem_usage': True}
+    if bfloat16:
+        kwargs['torch_dtype'] = torch.bfloat16
+    AutoTokenizer.from_pretrained(model).save_pretrained(out_dir)
+    AutoModelForCausalLM.from_pretrained(model, **kwargs).save_pretrained(out_dir)
+    return out_dir
+
+
+def build_tiny_checkpoint(out_dir):
+    """
+    A randomly initialised two-layer BioGPT with a 1k-word vocabulary saved
+    to out_dir, for load and throughput tests that must run without
+    downloading the real weights. Its output is gibberish.
+    """
+    from transformers import BioGptConfig, BioGptForCausalLM, BioGptTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    words = ['<s>', '<pad>', '</s>', '<unk>'] + [f'w{i}</w>' for i in range(1020)]
+    vocab_path = os.path.join(out_dir, 'vocab.json')
+    merges_path = os.path.join(out_dir, 'merges.txt')
+    with open(vocab_path, 'w') as f:
+        json.dump({w: i for i, w in enumerate(words)}, f)
+    with open(merges_path, 'w') as f:
+        f.write('')
+    tokenizer = BioGptTokenizer(vocab_path, merges_path)
+    config = BioGptConfig(vocab_size=len(words), hidden_size=128, num_hidden_layers=2,
+                          num_attention_heads=4, intermediate_size=512, max_position_embeddings=512)
+    BioGptForCausalLM(config).save_pretrained(out_dir)
+    tokenizer.save_pretrained(out_dir)
+    return out_dir
@@ -0,0 +1,102 @@
+import os
+import threading
+
+import numpy as np
+
+# Every backend exposes predict(batch, verbose=0) -> (N, num_classes) float32,
+# the same call signature as a Keras model, so app.py does not care which runs.
+BACKENDS = ('keras', 'tflite', 'onnx')
+
+DEFAULT_EXTENSIONS = {'keras': '.keras', 'tflite': '.tflite', 'onnx': '.onnx'}
+
+
+class TFLiteBackend:
+    """Runs a .tflite export with tflite_runtime (or tf.lite when that is all there is)."""
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.path = path
+        self._interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = None
+        # The interpreter holds mutable tensor state, one call at a time
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            shape = [batch_size] + list(self._input['shape'][1:])
+            self._interpreter.resize_tensor_input(self._input['index'], shape)
+            self._interpreter.allocate_tensors()
+            self._input = self._interpreter.get_input_details()[0]
+            self._output = self._interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def predict(self, batch, verbose=0):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(len(batch))
+            dtype = self._input['dtype']
+            if dtype != np.float32:
+                # Fully integer-quantized model: map floats onto its input scale
+                scale, zero_point = self._input['quantization']
+                batch = np.round(batch / scale + zero_point).astype(dtype)
+            self._interpreter.set_tensor(self._input['index'], batch)
+            self._interpreter.invoke()
+            out = self._interpreter.get_tensor(self._output['index'])
+            if self._output['dtype'] != np.float32:
+                scale, zero_point = self._output['quantization']
+                out = (out.astype(np.float32) - zero_point) * scale
+            return np.array(out, dtype=np.float32)
+
+
+class ONNXBackend:
+    """Runs an .onnx export with onnxruntime on CPU."""
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+        self.path = path
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self._session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, batch, verbose=0):
+        batch = np.asarray(batch, dtype=np.float32)
+        return self._session.run(None, {self._input_name: batch})[0]
+
+
+def resolve_backend(name, default='keras'):
+    """name if it is a known backend, else default (with a warning) so a typo cannot stop the server."""
+    name = (name or default).strip().lower()
+    if name in BACKENDS:
+        return name
+    print(f"[WARNING] Unknown inference backend '{name}' (expected one of {', '.join(BACKENDS)}); using {default}")
+    return default
+
+
+def exported_path(keras_path, backend, quantize=None):
+    """ai_models/mela_model_final.keras -> ai_models/mela_model_final[.int8].tflite"""
+    base = os.path.splitext(keras_path)[0]
+    suffix = f".{quantize}" if quantize else ''
+    return base + suffix + DEFAULT_EXTENSIONS[backend]
+
+
+def load_backend(backend, path, num_threads=None):
+    """
+    backend: 'keras', 'tflite' or 'onnx'
+    path: model file for that backend
+    returns: object with a Keras-style predict()
+    """
+    if backend == 'keras':
+        import tensorflow as tf
+        return tf.keras.models.load_model(path)
+    if backend == 'tflite':
+        return TFLiteBackend(path, num_threads)
+    if backend == 'onnx':
+        return ONNXBackend(path, num_threads)
+    raise ValueError(f"Unknown inference backend '{backend}' (expected one of {', '.join(BACKENDS)})")
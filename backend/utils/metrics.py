@@ -0,0 +1,263 @@
+import os
+import time
+import bisect
+import threading
+
+from flask import g, request, Response
+from pymongo import monitoring
+
+# METRICS_ENABLED=0 skips the request hooks and the /metrics route entirely
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+
+# Seconds; spans a cached /api call (~1 ms) up to a cold BioGPT generation
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram, one series per label value tuple.
+
+    observe() is a bisect plus three in-place updates under one lock; the
+    cumulative counts Prometheus expects are only built at render time.
+    """
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [per-bucket counts (last = +Inf), sum, count]
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """{label values: (count, sum)}, mainly for tests and /stats-style endpoints."""
+        with self._lock:
+            return {labels: (series[2], series[1]) for labels, series in self._series.items()}
+
+    def render(self):
+        with self._lock:
+            series = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items()]
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, counts, total, count in sorted(series):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == '+Inf' else f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_label_text(self.label_names, labels, le)} {cumulative}')
+            label_text = _label_text(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_text} {_number(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+class Counter:
+    """Monotonic counter, one series per label value tuple."""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f'# HELP {self.name}_total {self.help}', f'# TYPE {self.name}_total counter']
+        lines += [f'{self.name}_total{_label_text(self.label_names, labels)} {_number(value)}'
+                  for labels, value in values]
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time (e.g. a queue depth from some stats())."""
+
+    def __init__(self, name, help_text, read):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def render(self):
+        try:
+            value = self.read()
+        except Exception:
+            # A broken callback must not take the whole scrape down
+            return []
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge', f'{self.name} {_number(value)}']
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            # Re-registering a name (module reloads, tests) returns the existing metric
+            return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, label_names, buckets))
+
+    def counter(self, name, help_text, label_names=()):
+        return self._add(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, read):
+        with self._lock:
+            # Gauges are replaced so the callback always points at the current object
+            self._metrics[name] = Gauge(name, help_text, read)
+            return self._metrics[name]
+
+    def render(self):
+        """Everything in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for _, metric in metrics:
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+REQUEST_SECONDS = metrics.histogram(
+    'http_request_duration_seconds',
+    'Time from request start until the view returns its response; excludes producing a streamed body.',
+    ('endpoint', 'method', 'status'))
+STAGE_SECONDS = metrics.histogram(
+    'pipeline_stage_duration_seconds', 'Time spent in named stages of the analyze and chatbot pipelines.',
+    ('pipeline', 'stage'))
+REQUEST_MONGO_QUERIES = metrics.histogram(
+    'mongo_queries_per_request', 'MongoDB commands issued before the view returns (not while a body streams).',
+    ('endpoint',), QUERY_BUCKETS)
+MONGO_COMMANDS = metrics.counter('mongo_commands', 'MongoDB commands issued, by command name.', ('command',))
+
+
+class stage:
+    """
+    Times a named pipeline stage:
+
+        with stage('analyze', 'preprocess'):
+            ...
+
+    A plain class rather than @contextmanager: no generator per use.
+    """
+
+    __slots__ = ('pipeline', 'name', 'start')
+
+    def __init__(self, pipeline, name):
+        self.pipeline = pipeline
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, self.pipeline, self.name)
+        return False
+
+
+class MongoQueryCounter(monitoring.CommandListener):
+    """
+    pymongo command listener: counts every command by name, and per request
+    for the thread that called begin(). Pass it to mongoengine.connect()
+    as event_listeners=[mongo_queries]; commands issued from background
+    threads count towards mongo_commands_total only.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def begin(self):
+        self._local.count = 0
+
+    def end(self):
+        """Commands since begin() on this thread, or None if begin() was not called."""
+        count = getattr(self._local, 'count', None)
+        self._local.count = None
+        return count
+
+    def started(self, event):
+        MONGO_COMMANDS.inc(event.command_name)
+        if getattr(self._local, 'count', None) is not None:
+            self._local.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+mongo_queries = MongoQueryCounter()
+
+
+def _endpoint():
+    # The URL rule, not the path, so /api/appointments/<id> stays one series
+    rule = request.url_rule
+    return rule.rule if rule is not None else '<unmatched>'
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    mongo_queries.begin()
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        endpoint = _endpoint()
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, request.method, response.status_code)
+        queries = mongo_queries.end()
+        if queries is not None:
+            REQUEST_MONGO_QUERIES.observe(queries, endpoint)
+    return response
+
+
+def metrics_view():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def init_app(app, path='/metrics'):
+    """Time every request of app (all blueprints) and serve the registry at path."""
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule(path, 'metrics', metrics_view, methods=['GET'])
@@ -0,0 +1,105 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Loads heavy models on first use instead of at import time.
+
+    Each model is registered with a zero-argument loader. get() runs the
+    loader once (other threads asking for the same model wait for it) and
+    caches the result. A loader may return None to say the model is not
+    available, e.g. the weights file is missing.
+    """
+
+    NOT_LOADED = 'not_loaded'
+    LOADING = 'loading'
+    READY = 'ready'
+    UNAVAILABLE = 'unavailable'
+    FAILED = 'failed'
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._lock:
+            self._entries[name] = {
+                'loader': loader,
+                'model': None,
+                'state': self.NOT_LOADED,
+                'error': None,
+                'loadSeconds': None,
+                'lock': threading.Lock()
+            }
+
+    def _entry(self, name):
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"No model registered as '{name}'")
+
+    def get(self, name):
+        """Return the loaded model (loading it if needed), or None if unavailable."""
+        entry = self._entry(name)
+        if entry['state'] == self.READY:
+            return entry['model']
+        with entry['lock']:
+            if entry['state'] in (self.NOT_LOADED, self.LOADING):
+                self._load(name, entry)
+            return entry['model']
+
+    def _load(self, name, entry):
+        # Called with the entry lock held
+        entry['state'] = self.LOADING
+        start = time.perf_counter()
+        try:
+            model = entry['loader']()
+        except Exception as e:
+            print(f"[ERROR] Failed to load model '{name}': {e}")
+            entry['model'], entry['state'], entry['error'] = None, self.FAILED, str(e)
+        else:
+            entry['model'] = model
+            entry['state'] = self.READY if model is not None else self.UNAVAILABLE
+            entry['error'] = None
+        entry['loadSeconds'] = round(time.perf_counter() - start, 3)
+
+    def reload(self, name):
+        """Drop the cached model and load it again (e.g. after replacing weights)."""
+        entry = self._entry(name)
+        with entry['lock']:
+            self._load(name, entry)
+        return entry['model']
+
+    def is_ready(self, name):
+        return self._entry(name)['state'] == self.READY
+
+    def names(self):
+        return list(self._entries)
+
+    def warm_async(self, names=None):
+        """Load the given models (default: all) in a background thread."""
+        names = list(names) if names is not None else self.names()
+
+        def warm():
+            for name in names:
+                self.get(name)
+
+        thread = threading.Thread(target=warm, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        return {
+            name: {
+                'state': entry['state'],
+                'ready': entry['state'] == self.READY,
+                'error': entry['error'],
+                'loadSeconds': entry['loadSeconds']
+            }
+            for name, entry in list(self._entries.items())
+        }
+
+
+# Shared by all blueprints in the process
+registry = ModelRegistry()
@@ -0,0 +1,116 @@
+import json
+import base64
+from itertools import islice
+
+from bson import ObjectId
+from flask import Response, stream_with_context
+from mongoengine.queryset.visitor import Q
+
+from utils.serialization import dumps
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def wants_pagination(args):
+    return 'limit' in args or 'cursor' in args
+
+
+def page_size(args):
+    """?limit= clamped to 1..MAX_PAGE_SIZE; raises ValueError when not an integer."""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(doc, order):
+    values = []
+    for field, _ in order:
+        value = doc.pk if field == 'id' else getattr(doc, field, None)
+        values.append(str(value) if isinstance(value, ObjectId) else value)
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, order):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(order):
+        raise ValueError('Invalid cursor')
+    if order[-1][0] == 'id':
+        try:
+            values[-1] = ObjectId(values[-1])
+        except Exception:
+            raise ValueError('Invalid cursor')
+    return values
+
+
+def _after(field, direction, value):
+    """Q matching documents strictly after value for one sort key (None sorts first)."""
+    if value is None:
+        return Q(**{f'{field}__ne': None}) if direction > 0 else None
+    return Q(**{f'{field}__{"gt" if direction > 0 else "lt"}': value})
+
+
+def keyset_filter(order, values):
+    """
+    order: [(field, 1 | -1), ...] matching the queryset's order_by, ending in a unique field
+    values: sort key of the last row already returned
+    returns: Q selecting the rows after that one
+    """
+    query = None
+    for i, (field, direction) in enumerate(order):
+        term = _after(field, direction, values[i])
+        if term is None:
+            continue
+        for j in range(i):
+            term &= Q(**{order[j][0]: values[j]})
+        query = term if query is None else query | term
+    return query
+
+
+def order_by_args(order):
+    return [('-' if direction < 0 else '') + field for field, direction in order]
+
+
+def paginate(queryset, order, args):
+    """
+    Keyset pagination driven by ?limit= and ?cursor=.
+    returns: (documents for this page, next cursor or None)
+    """
+    limit = page_size(args)
+    queryset = queryset.order_by(*order_by_args(order))
+    cursor = args.get('cursor')
+    if cursor:
+        after = keyset_filter(order, decode_cursor(cursor, order))
+        if after is not None:
+            queryset = queryset.filter(after)
+    docs = list(queryset.limit(limit + 1))
+    next_cursor = encode_cursor(docs[limit - 1], order) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_ndjson(queryset, serialize_chunk, chunk_size=500):
+    """
+    Stream a queryset as newline-delimited JSON while the Mongo cursor yields,
+    serializing chunk_size documents at a time.
+    """
+    def generate():
+        for chunk in _chunks(queryset.batch_size(chunk_size), chunk_size):
+            yield b''.join(dumps(row) + b'\n' for row in serialize_chunk(chunk))
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.batching import QueueFullError
+
+
+def bcrypt_cost(hashed):
+    """Work factor stored in a bcrypt hash ('$2b$12$...' -> 12), or None."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so each worker keeps one core busy; capping the
+    workers leaves the remaining cores to request threads of every other
+    blueprint instead of letting a login spike take them all.
+
+    bcrypt: flask_bcrypt.Bcrypt instance
+    workers: pool size (0 = run in the calling thread, the old behaviour)
+    max_queue: hashes allowed to wait for a worker before hash()/check()
+               raise QueueFullError (0 = unbounded)
+    rounds: bcrypt work factor for new hashes
+    """
+
+    def __init__(self, bcrypt, workers=2, max_queue=64, rounds=12):
+        self.bcrypt = bcrypt
+        self.workers = max(0, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.rounds = int(rounds)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._work_total = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+        return self._executor
+
+    def _timed(self, fn, args, submitted):
+        started = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                wait = started - submitted
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+                self._work_total += finished - started
+
+    def _run(self, fn, *args):
+        with self._lock:
+            # Queued = accepted but not yet picked up by a worker
+            full = self.workers and self.max_queue and self._pending - self.workers >= self.max_queue
+            if full:
+                self._rejected += 1
+            else:
+                self._pending += 1
+        if full:
+            raise QueueFullError("password hashing queue is full", self.estimated_wait())
+        submitted = time.monotonic()
+        if not self.workers:
+            return self._timed(fn, args, submitted)
+        return self._get_executor().submit(self._timed, fn, args, submitted).result()
+
+    def hash(self, password):
+        """bcrypt hash of password (str) at the configured work factor."""
+        return self._run(self.bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def check(self, hashed, password):
+        return self._run(self.bcrypt.check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed):
+        """True when hashed was made with a different work factor than the current one."""
+        return bcrypt_cost(hashed) != self.rounds
+
+    def estimated_wait(self):
+        """Rough seconds until a new hash would start (at least 1)."""
+        with self._lock:
+            per_hash = self._work_total / self._completed if self._completed else 0.25
+            queued = max(0, self._pending - self.workers)
+        return max(1, int(queued * per_hash / max(1, self.workers)) + 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'rounds': self.rounds,
+                'inFlight': self._pending,
+                'queueDepth': max(0, self._pending - self.workers),
+                'maxQueue': self.max_queue,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avgWaitMs': round(self._wait_total / self._completed * 1000, 2) if self._completed else 0.0,
+                'maxWaitMs': round(self._wait_max * 1000, 2),
+                'avgHashMs': round(self._work_total / self._completed * 1000, 2) if self._completed else 0.0
+            }
+
+
+def create_hasher(bcrypt):
+    """PasswordHasher configured from BCRYPT_WORKERS, BCRYPT_MAX_QUEUE and BCRYPT_ROUNDS."""
+    return PasswordHasher(bcrypt,
+                          workers=int(os.getenv('BCRYPT_WORKERS', '2')),
+                          max_queue=int(os.getenv('BCRYPT_MAX_QUEUE', '64')),
+                          rounds=int(os.getenv('BCRYPT_ROUNDS', '12')))
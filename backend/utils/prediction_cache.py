@@ -0,0 +1,156 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def model_identity(path):
+    """'path:mtime' of a model file, recorded when that file is loaded."""
+    path = os.path.abspath(path)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = 0
+    return f"{path}:{mtime}"
+
+
+class PredictionCache:
+    """
+    LRU cache of model outputs keyed by the SHA-256 of the uploaded bytes.
+
+    model_path: model file expected to be served; its identity (path, mtime)
+                is part of every key until the loader reports the model it
+                actually loaded through set_model()
+    max_entries: in-memory size bound (0 disables caching)
+    db_path: optional SQLite file used as a persistent second level
+    """
+
+    def __init__(self, model_path, max_entries=1024, db_path=None):
+        self.model_path = os.path.abspath(model_path)
+        self.max_entries = int(max_entries)
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._model_id = model_identity(model_path)
+        if db_path:
+            self._open_db()
+
+    def reopen(self):
+        """New SQLite connection, e.g. in a worker process after fork (connections must not cross a fork)."""
+        with self._lock:
+            if self.db_path:
+                # The inherited connection is dropped, not closed: the parent still uses it
+                self._db = None
+                self._open_db()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @property
+    def model_id(self):
+        return self._model_id
+
+    def _open_db(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " image_hash TEXT NOT NULL,"
+            " model_id TEXT NOT NULL,"
+            " probabilities TEXT NOT NULL,"
+            " PRIMARY KEY (image_hash, model_id))"
+        )
+        # Rows from older models can never match again
+        self._db.execute("DELETE FROM predictions WHERE model_id != ?", (self._model_id,))
+        self._db.commit()
+
+    def set_model(self, model_id):
+        """
+        Called whenever a model is (re)loaded, with model_identity() of the file
+        it was loaded from. Outputs are only valid for the model in memory, not
+        for whatever file is on disk now, so the cache empties itself only here.
+        """
+        with self._lock:
+            if model_id == self._model_id:
+                return
+            self._model_id = model_id
+            self._entries.clear()
+            self.invalidations += 1
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions WHERE model_id != ?", (model_id,))
+                self._db.commit()
+
+    @staticmethod
+    def image_key(image_bytes):
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def get(self, key):
+        """Return the cached probability vector for key, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            probs = self._entries.get(key)
+            if probs is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return probs
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT probabilities FROM predictions WHERE image_hash = ? AND model_id = ?",
+                    (key, self._model_id)
+                ).fetchone()
+                if row is not None:
+                    probs = np.asarray(json.loads(row[0]), dtype='float32')
+                    self._remember(key, probs)
+                    self.hits += 1
+                    return probs
+            self.misses += 1
+            return None
+
+    def put(self, key, probs):
+        if not self.enabled:
+            return
+        probs = np.asarray(probs, dtype='float32')
+        with self._lock:
+            self._remember(key, probs)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions (image_hash, model_id, probabilities) VALUES (?, ?, ?)",
+                    (key, self._model_id, json.dumps(probs.tolist()))
+                )
+                self._db.commit()
+
+    def _remember(self, key, probs):
+        self._entries[key] = probs
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'persistent': self._db is not None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
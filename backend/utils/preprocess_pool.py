@@ -0,0 +1,162 @@
+import os
+import queue
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from utils.preprocessing import preprocess_melanoma_bytes, preprocess_melanoma_image
+
+IMAGE_SHAPE = (224, 224, 3)
+
+# Set inside each worker process by _init_worker
+_worker_slots = None
+_worker_shm = None
+
+def _init_worker(shm_name, num_slots):
+    global _worker_slots, _worker_shm
+    # One process per core already; keep OpenCV from spawning its own threads
+    cv2.setNumThreads(1)
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_slots = np.ndarray((num_slots,) + IMAGE_SHAPE, dtype=np.uint8, buffer=_worker_shm.buf)
+
+def _preprocess_into_slot(source, slot):
+    # Only the slot index travels back; the pixels stay in shared memory
+    if isinstance(source, str):
+        img = preprocess_melanoma_image(source)
+    else:
+        img = preprocess_melanoma_bytes(source)
+    _worker_slots[slot] = img
+    return slot
+
+
+class PreprocessPool:
+    """
+    Runs preprocess_melanoma_* in worker processes.
+
+    Each worker writes its 224x224x3 result into a slot of one shared memory
+    block, so results are never pickled. A slot is held only until the caller
+    has copied its image out.
+
+    workers: number of worker processes
+    slots: number of result slots (bounds in-flight jobs), default 2 per worker
+    """
+
+    def __init__(self, workers=None, slots=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.num_slots = slots or self.workers * 2
+        slot_bytes = int(np.prod(IMAGE_SHAPE))
+        self._shm = shared_memory.SharedMemory(create=True, size=self.num_slots * slot_bytes)
+        self._slots = np.ndarray((self.num_slots,) + IMAGE_SHAPE, dtype=np.uint8, buffer=self._shm.buf)
+        self._free = queue.Queue()
+        for i in range(self.num_slots):
+            self._free.put(i)
+        # The pool is created lazily in a web worker that already runs threads (model
+        # runtimes, batchers, the storage writers); forking it could copy a lock some
+        # other thread holds, so workers start from a clean forkserver process instead
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=_init_worker,
+            initargs=(self._shm.name, self.num_slots)
+        )
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def preprocess(self, source, timeout=None):
+        """
+        source: encoded image bytes / NumPy buffer, or a file path
+        returns: preprocessed 224x224 RGB image (owned by the caller)
+        """
+        if isinstance(source, np.ndarray) or isinstance(source, memoryview):
+            source = bytes(source)
+        slot = self._free.get(timeout=timeout)
+        try:
+            future = self._executor.submit(_preprocess_into_slot, source, slot)
+        except BaseException:
+            self._free.put(slot)
+            raise
+        try:
+            future.result(timeout)
+            return self._slots[slot].copy()
+        finally:
+            if future.done():
+                self._free.put(slot)
+            else:
+                # Timed out: the worker may still write into the slot, so it is freed only when the job ends
+                future.add_done_callback(lambda _: self._free.put(slot))
+
+    def map(self, sources):
+        """Preprocess many sources concurrently, yielding (index, image or exception) in completion order."""
+        pending = {}
+        sources = iter(sources)
+        index = 0
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                # Keep every free slot busy; block for one only when idle
+                while not exhausted:
+                    try:
+                        slot = self._free.get(block=not pending)
+                    except queue.Empty:
+                        break
+                    try:
+                        source = next(sources)
+                    except StopIteration:
+                        self._free.put(slot)
+                        exhausted = True
+                        break
+                    future = self._executor.submit(_preprocess_into_slot, source, slot)
+                    pending[future] = (index, slot)
+                    index += 1
+                if not pending:
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                i, slot = pending.pop(future)
+                try:
+                    future.result()
+                    yield i, self._slots[slot].copy()
+                except Exception as e:
+                    yield i, e
+                finally:
+                    self._free.put(slot)
+        finally:
+            # Caller stopped early: let in-flight jobs finish before reusing their slots
+            for future, (_, slot) in pending.items():
+                future.exception()
+                self._free.put(slot)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        # Drop our NumPy view before closing the mapping
+        self._slots = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+def get_preprocess_pool(workers):
+    """Shared pool for the web process, created on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = PreprocessPool(workers)
+            atexit.register(_default_pool.close)
+        return _default_pool
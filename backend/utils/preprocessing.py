@@ -1,13 +1,22 @@
 import cv2
 import numpy as np
 
-def preprocess_melanoma_image(image_path):
+def decode_image(data):
     """
-    image_path: path to the uploaded image
+    data: raw encoded image (bytes, bytearray, memoryview or uint8 NumPy buffer)
+    returns: decoded BGR image
+    """
+    buf = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.reshape(-1)
+    img = cv2.imdecode(buf, cv2.IMREAD_COLOR) if buf.size else None
+    if img is None:
+        raise ValueError("Image not found or invalid format")
+    return img
+
+def preprocess_melanoma_array(img):
+    """
+    img: decoded BGR image (as returned by cv2.imread / cv2.imdecode)
     returns: preprocessed 224x224 image ready for model
     """
-    # Read image
-    img = cv2.imread(image_path)
     if img is None:
         raise ValueError("Image not found or invalid format")
     
@@ -39,3 +48,35 @@ def preprocess_melanoma_image(image_path):
     img_rgb = cv2.cvtColor(img_resized, cv2.COLOR_BGR2RGB)
     
     return img_rgb
+
+def preprocess_melanoma_bytes(data):
+    """
+    data: encoded image bytes or NumPy buffer (e.g. an upload read into memory)
+    returns: preprocessed 224x224 image ready for model, without touching disk
+    """
+    return preprocess_melanoma_array(decode_image(data))
+
+def preprocess_melanoma_image(image_path):
+    """
+    image_path: path to the uploaded image
+    returns: preprocessed 224x224 image ready for model
+    """
+    # Read image
+    img = cv2.imread(image_path)
+    if img is None:
+        raise ValueError("Image not found or invalid format")
+    return preprocess_melanoma_array(img)
+
+def tta_variants(img):
+    """
+    img: preprocessed image (H, W, C)
+    returns: (6, H, W, C) stack of the image, its flips and rotations
+    """
+    return np.stack([
+        img,
+        np.fliplr(img),
+        np.flipud(img),
+        np.rot90(img, 1),
+        np.rot90(img, 2),
+        np.rot90(img, 3)
+    ])
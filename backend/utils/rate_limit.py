@@ -0,0 +1,57 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+
+
+class KeyedRateLimiter:
+    """
+    One token bucket per key (e.g. per login email).
+
+    capacity: attempts allowed in a burst
+    per_minute: tokens refilled per minute
+    max_keys: buckets kept; the least recently used are dropped first (a
+              dropped key simply starts again with a full bucket)
+    """
+
+    def __init__(self, capacity=5, per_minute=5, max_keys=10000):
+        self.capacity = float(capacity)
+        self.rate = float(per_minute) / 60.0
+        self.max_keys = int(max_keys)
+        self.allowed = 0
+        self.throttled = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Take one token. Returns 0 when allowed, else seconds until the next token."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+                self.allowed += 1
+            else:
+                retry_after = max(1, math.ceil((1 - tokens) / self.rate)) if self.rate else 60
+                self.throttled += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def reset(self, key):
+        """Forget key's history (e.g. after a successful login)."""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keys': len(self._buckets),
+                'capacity': self.capacity,
+                'perMinute': round(self.rate * 60, 2),
+                'allowed': self.allowed,
+                'throttled': self.throttled
+            }
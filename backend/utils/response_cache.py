@@ -0,0 +1,144 @@
+import os
+import time
+import hashlib
+import threading
+
+
+class InProcessBackend:
+    """
+    Dict store with per-key expiry, local to one worker process.
+
+    Every delete() bumps the key's generation; set_if_generation() only
+    stores a value built while the generation stayed the same.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def generation(self, key):
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def set_if_generation(self, key, value, ttl, generation):
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return False
+            self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._data.pop(key, None)
+
+
+class RedisBackend:
+    """Shares cached responses (and their invalidation) between worker processes."""
+
+    def __init__(self, url, prefix='skin_app:'):
+        import redis
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        return self._client.get(self._prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self._prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def generation(self, key):
+        return int(self._client.get(self._prefix + key + ':gen') or 0)
+
+    def set_if_generation(self, key, value, ttl, generation):
+        gen_key = self._prefix + key + ':gen'
+        with self._client.pipeline() as pipe:
+            try:
+                # Any invalidation from any process between here and EXEC aborts the store
+                pipe.watch(gen_key)
+                if int(pipe.get(gen_key) or 0) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(self._prefix + key, value, ex=int(ttl) if ttl else None)
+                pipe.execute()
+                return True
+            except self._redis.WatchError:
+                return False
+
+    def delete(self, key):
+        with self._client.pipeline() as pipe:
+            pipe.incr(self._prefix + key + ':gen')
+            pipe.delete(self._prefix + key)
+            pipe.execute()
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized response bodies with strong ETags.
+
+    Entries are stored as b'<etag>\\n<body>', so a hit does not rehash the
+    body. A build that overlaps an invalidation is returned to its caller
+    but not stored, so the stale body cannot outlive the invalidation.
+
+    backend: object with get/set/delete/generation/set_if_generation
+             (InProcessBackend, RedisBackend, ...)
+    ttl: seconds before an entry is rebuilt even without an invalidation
+    """
+
+    def __init__(self, backend, ttl=300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_etag(body):
+        return hashlib.sha1(body).hexdigest()
+
+    def get_or_build(self, key, builder):
+        """
+        builder: zero-argument callable returning the response body as bytes
+        returns: (body, etag)
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            self.hits += 1
+            etag, body = entry.split(b'\n', 1)
+            return body, etag.decode('ascii')
+        self.misses += 1
+        generation = self.backend.generation(key)
+        body = builder()
+        etag = self.make_etag(body)
+        self.backend.set_if_generation(key, etag.encode('ascii') + b'\n' + body, self.ttl, generation)
+        return body, etag
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+
+def create_backend():
+    """Backend from CACHE_BACKEND ('memory' or 'redis' with REDIS_URL)."""
+    kind = os.getenv('CACHE_BACKEND', 'memory').lower()
+    if kind == 'redis':
+        try:
+            return RedisBackend(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        except ImportError:
+            print("[WARNING] CACHE_BACKEND=redis but the redis package is not installed; using memory")
+    return InProcessBackend()
@@ -0,0 +1,150 @@
+import os
+import re
+import time
+import threading
+
+_END = ''       # trie key marking "a term ends here"
+_PREFIX = '*'   # trie key marking "a prefix term ends here" (any word ending allowed)
+
+
+def read_vocabulary(path):
+    """Terms from a vocabulary file: one per line, '#' starts a comment, blank lines ignored."""
+    terms = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            term = line.split('#', 1)[0].strip()
+            if term:
+                terms.append(term)
+    return terms
+
+
+def _trie_pattern(node):
+    """Regex for every path in a trie, sharing common prefixes so matching stays linear."""
+    branches = []
+    singles = []
+    for char in sorted(k for k in node if k not in (_END, _PREFIX)):
+        sub = _trie_pattern(node[char])
+        if sub is None:
+            singles.append(re.escape(char))
+        else:
+            branches.append(re.escape(char) + sub)
+    if len(singles) == 1:
+        branches.append(singles[0])
+    elif singles:
+        branches.append('[' + ''.join(singles) + ']')
+
+    # A prefix term may be followed by more word characters; a plain term may not
+    endings = []
+    if _PREFIX in node:
+        endings.append(r'\w*')
+    elif _END in node:
+        endings.append('')
+
+    if not branches:
+        return endings[0] if endings and endings[0] else None
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if not endings:
+        return body
+    if endings[0]:
+        # Longest match first: the rest of the trie, else any word ending
+        return '(?:' + body + '|' + endings[0] + ')'
+    return '(?:' + body + ')?'
+
+
+def compile_vocabulary(terms):
+    """
+    One regex matching any term as a whole word (case-insensitive).
+
+    A term ending in '*' is a prefix: 'melanom*' matches melanoma, melanomas
+    and melanomatous. Multi-word terms match with any run of whitespace.
+    """
+    trie = {}
+    for term in terms:
+        term = term.casefold().strip()
+        prefix = term.endswith('*')
+        term = ' '.join(term.rstrip('*').split())
+        if not term:
+            continue
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[_PREFIX if prefix else _END] = True
+    body = _trie_pattern(trie)
+    if body is None:
+        # Nothing to match: a pattern that never matches
+        return re.compile(r'(?!x)x')
+    body = body.replace(r'\ ', r'\s+')
+    # Lookarounds instead of \b so terms starting/ending in non-word characters still work
+    return re.compile(r'(?<!\w)' + body + r'(?!\w)')
+
+
+class ScopeFilter:
+    """
+    Decides whether a chatbot question is about skin topics.
+
+    The vocabulary file is compiled into a single regex at construction.
+    Every check_interval seconds a lookup also checks the file's mtime and
+    recompiles it when it changed, so terms can be edited without a restart.
+    A file that fails to load keeps the previous vocabulary.
+
+    path: vocabulary file (see read_vocabulary)
+    fallback: terms used when path does not exist
+    """
+
+    def __init__(self, path=None, fallback=(), check_interval=5.0):
+        self.path = path
+        self.fallback = list(fallback)
+        self.check_interval = float(check_interval)
+        self.reloads = 0
+        self.terms = 0
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._pattern = compile_vocabulary(self.fallback)
+        self.reload()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns if self.path else None
+        except OSError:
+            return None
+
+    def reload(self):
+        """Recompile from the vocabulary file (or the fallback); returns the term count."""
+        with self._lock:
+            mtime = self._file_mtime()
+            try:
+                terms = read_vocabulary(self.path) if mtime is not None else self.fallback
+                pattern = compile_vocabulary(terms)
+            except (OSError, UnicodeDecodeError, re.error) as e:
+                print(f"[WARNING] Could not load scope vocabulary {self.path}: {e}")
+                return self.terms
+            # Readers pick up the new pattern on their next lookup
+            self._pattern, self.terms, self._mtime = pattern, len(terms), mtime
+            self.reloads += 1
+            self._next_check = time.monotonic() + self.check_interval
+            return self.terms
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        if self._file_mtime() != self._mtime:
+            self.reload()
+
+    def find(self, text):
+        """The first vocabulary term found in text, or None."""
+        self._maybe_reload()
+        match = self._pattern.search(text.casefold())
+        return match.group(0) if match else None
+
+    def __call__(self, text):
+        return self.find(text) is not None
+
+    def stats(self):
+        return {
+            'path': self.path if self._mtime is not None else None,
+            'terms': self.terms,
+            'reloads': self.reloads
+        }
@@ -0,0 +1,188 @@
+import os
+import json
+from datetime import datetime, date
+
+from bson import ObjectId, DBRef
+from flask import Response
+from mongoengine import fields as me_fields
+
+# ----- JSON BACKEND -----
+# JSON_BACKEND=auto uses orjson when it is installed, json=stdlib always.
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto').lower()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    # Only reached for types the encoders did not already convert
+    if isinstance(value, (ObjectId, DBRef)):
+        return str(value.id if isinstance(value, DBRef) else value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None and JSON_BACKEND != 'json':
+    def dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes."""
+        return orjson.dumps(obj, default=_default)
+else:
+    def dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes."""
+        return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Like jsonify(), but through dumps() (orjson when available)."""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+# ----- VALUE CONVERTERS -----
+
+def _identity(value):
+    return value
+
+
+def _object_id(value):
+    return str(value) if value is not None else None
+
+
+def _datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def plain(value):
+    """JSON-safe copy of an arbitrary stored value (ObjectIds and datetimes as strings)."""
+    convert = _PLAIN.get(type(value))
+    if convert is not None:
+        return convert(value)
+    # mongoengine's BaseDict/BaseList and other subclasses miss the exact-type lookup
+    if isinstance(value, dict):
+        return {k: plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+_PLAIN = {
+    ObjectId: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    DBRef: lambda ref: str(ref.id),
+    list: lambda items: [plain(item) for item in items],
+    tuple: lambda items: [plain(item) for item in items],
+    dict: lambda mapping: {k: plain(v) for k, v in mapping.items()},
+}
+
+# Declared field types whose stored values are already JSON-safe
+_SCALAR_FIELDS = (me_fields.StringField, me_fields.IntField, me_fields.FloatField,
+                  me_fields.BooleanField, me_fields.LongField)
+
+
+def _converter_for(field):
+    if isinstance(field, _SCALAR_FIELDS):
+        return _identity
+    if isinstance(field, me_fields.ObjectIdField):
+        return _object_id
+    if isinstance(field, me_fields.DateTimeField):
+        return _datetime
+    # Dynamic and container fields: inspect the value itself
+    return plain
+
+
+# ----- ENCODERS -----
+
+class DocumentEncoder:
+    """
+    Precompiled to_dict() for one document class.
+
+    document: mongoengine document class
+    fields: [(output key, default when the stored document lacks it), ...];
+            'id' and '_id' output the primary key as a string
+
+    Each field's converter is picked once from the declared field type, so
+    encoding a document is one pass over a list with no recursive walking
+    of values that cannot contain ObjectIds. encode() takes either a loaded
+    document's _data or a raw document from .as_pymongo() (the latter skips
+    building mongoengine objects altogether).
+    """
+
+    ID_KEYS = ('id', '_id')
+
+    def __init__(self, document, fields):
+        self.document = document
+        self.keys = tuple(key for key, _ in fields)
+        self._specs = {}
+        for key, default in fields:
+            if key in self.ID_KEYS:
+                continue
+            field = document._fields.get(key)
+            if field is not None:
+                # Unset declared fields load as the field default (like getattr on a document)
+                default = field.default() if callable(field.default) else field.default
+            self._specs[key] = (_converter_for(field), default)
+        self._compiled = {}
+        self._steps = self._compile(self.keys)
+
+    def _compile(self, keys):
+        return [(key, None, None) if key in self.ID_KEYS else (key,) + self._specs[key] for key in keys]
+
+    def project(self, requested):
+        """
+        requested: iterable of output keys (e.g. from ?fields=)
+        returns: key tuple in declaration order, always including id/_id
+        raises: ValueError naming unknown keys
+        """
+        requested = set(requested)
+        unknown = requested - set(self.keys)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        return tuple(key for key in self.keys if key in requested or key in self.ID_KEYS)
+
+    def db_fields(self, keys):
+        """Stored field names behind keys, for QuerySet.only()."""
+        return [key for key in keys if key in self._specs]
+
+    def _steps_for(self, keys):
+        if keys is None:
+            return self._steps
+        steps = self._compiled.get(keys)
+        if steps is None:
+            steps = self._compiled[keys] = self._compile(keys)
+        return steps
+
+    def encode(self, data, pk, keys=None, overrides=None):
+        """
+        data: document._data or a raw .as_pymongo() dict
+        pk: primary key value
+        keys: projection from project(); None for every field
+        overrides: {key: already-encoded value} (e.g. embedded references)
+        """
+        out = {}
+        pk_str = str(pk)
+        for key, convert, default in self._steps_for(keys):
+            if convert is None:
+                out[key] = pk_str
+            elif overrides is not None and key in overrides:
+                out[key] = overrides[key]
+            else:
+                # Field names double as stored names (no db_field overrides in these models)
+                out[key] = convert(data.get(key, default))
+        return out
+
+    def encode_document(self, doc, keys=None, overrides=None):
+        return self.encode(doc._data, doc.pk, keys, overrides)
+
+    def encode_raw(self, raw, keys=None, overrides=None):
+        return self.encode(raw, raw.get('_id'), keys, overrides)
+
+
+def parse_fields(args, encoder):
+    """?fields=a,b,c as a projection for encoder, or None when absent."""
+    value = args.get('fields')
+    if not value:
+        return None
+    return encoder.project(name.strip() for name in value.split(',') if name.strip())
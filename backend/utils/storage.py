@@ -0,0 +1,61 @@
+import os
+import atexit
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from utils.metrics import stage
+
+# Disk writes happen on a small background pool so requests never wait on I/O
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=int(os.getenv('STORAGE_WORKERS', '2')),
+                                               thread_name_prefix='storage')
+                atexit.register(_executor.shutdown, wait=True)
+    return _executor
+
+def _write_bytes(path, data):
+    # A unique temp file per write: concurrent saves of the same name must not share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.part')
+    try:
+        with stage('storage', 'write'):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _write_image(path, image):
+    ext = os.path.splitext(path)[1] or '.jpg'
+    with stage('storage', 'imencode'):
+        ok, encoded = cv2.imencode(ext, image)
+    if not ok:
+        raise ValueError(f"Could not encode image for {path}")
+    _write_bytes(path, encoded.tobytes())
+
+def _log_failure(future, path):
+    error = future.exception()
+    if error is not None:
+        print(f"[ERROR] Background save failed for {path}: {error}")
+
+def save_bytes_async(path, data):
+    """Write raw bytes to path in the background. Returns a Future."""
+    future = _get_executor().submit(_write_bytes, path, bytes(data))
+    future.add_done_callback(lambda f: _log_failure(f, path))
+    return future
+
+def save_image_async(path, image):
+    """Encode a NumPy image (format from the extension) and write it in the background."""
+    future = _get_executor().submit(_write_image, path, image)
+    future.add_done_callback(lambda f: _log_failure(f, path))
+    return future
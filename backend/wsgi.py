@@ -0,0 +1,42 @@
+"""
+Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app      (Linux/macOS)
+    python serve.py                             (gunicorn when installed, else waitress)
+
+gunicorn imports this module once in the master (preload_app), so the
+read-only, pure-Python state built at import (label tables, curated
+answers, scope vocabulary, compiled encoders) exists before the workers
+fork and is shared between them copy-on-write.
+
+The models are deliberately NOT loaded here. TensorFlow, onnxruntime and
+torch start thread pools when a model loads, and those pools do not
+survive a fork: a worker calling predict()/generate() on a model loaded in
+the master can hang. Each worker loads its own models in start_worker().
+"""
+import gc
+import os
+
+from main_server import app, connect_db
+from app import prediction_cache
+from utils.model_registry import registry
+
+# WSGI_WARM_MODELS=1 (default) loads the models in the background as soon as
+# a worker starts; 0 leaves them to the first request that needs them
+WSGI_WARM_MODELS = os.getenv('WSGI_WARM_MODELS', '1') == '1'
+
+
+def start_worker():
+    """
+    Per-process setup, run in every gunicorn worker after the fork (and once
+    by waitress): fresh Mongo and SQLite connections, then the models.
+    """
+    connect_db()
+    prediction_cache.reopen()
+    if WSGI_WARM_MODELS:
+        registry.warm_async()
+
+
+# Move everything built at import out of the collector's reach: a GC pass in a
+# worker would otherwise write to every object header and unshare the pages
+gc.freeze()